@@ -0,0 +1,287 @@
+"""Batch analysis: score recorded WAV files window by window, without a microphone or LED.
+
+Each file is streamed in blocks through the same resampler, ring buffer, windowed encoder
+and voice gate as the live runner, so memory stays bounded however long the recording.
+Windows are scored on a bounded pool of concurrent Hume sockets (or the local stub scorer)
+and one row per window is written to CSV or Parquet. Each row's LED state is what the live
+runner would show after that window: the file's scores are replayed in order through the
+same smoothing, hysteresis, dwell time and multi-emotion mode.
+
+Usage:
+    python batch_analysis.py recordings/ -o results.csv
+    python batch_analysis.py recordings/ -o results.parquet --concurrency 8   # needs requirements-parquet.txt
+    python batch_analysis.py recordings/ -o results.csv --scorer stub
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import soundfile as sf
+from dotenv import load_dotenv
+
+from emotion_resolver import EmotionIndexResolver
+from led_controller import LEDController
+from mila import create_color_blender, create_decision_engine, create_hume_client, next_blend
+from mila_config import MilaConfig
+from resampler import PolyphaseResampler
+from result_cache import ResultCache
+from ring_buffer import AudioRingBuffer
+from scorers import HumeScorer, StubScorer, hume_emotion_names
+from vad import VoiceActivityGate
+from wav_encoder import WindowedWavEncoder
+
+
+def find_wav_files(paths):
+    """WAV files named directly or found (recursively) in the given directories, sorted."""
+    wav_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                wav_files.extend(os.path.join(dirpath, name) for name in filenames if name.lower().endswith('.wav'))
+        else:
+            wav_files.append(path)
+    return sorted(wav_files)
+
+
+def iter_windows(path, config, block_duration=0.5):
+    """Yield (window index, start s, end s, base64 WAV or None if silent) for each full analysis
+    window of `path`, reading the file `block_duration` seconds at a time."""
+    with sf.SoundFile(path) as audio_file:
+        resampler = PolyphaseResampler(audio_file.samplerate, config.samplerate)
+        encoder = WindowedWavEncoder(config.samplerate, config.step_samples, config.steps_per_window)
+        audio_buffer = AudioRingBuffer(encoder.window_samples + encoder.step_samples)
+        voice_gate = VoiceActivityGate(config.samplerate, hangover_blocks=config.steps_per_window - 1)
+        step_samples = encoder.step_samples
+
+        blocksize = max(1, int(audio_file.samplerate * block_duration))
+        for block in audio_file.blocks(blocksize, dtype='float32', always_2d=True):
+            samples = resampler.process(block.mean(axis=1, dtype=np.float32))
+            position = 0
+            while position < len(samples):
+                # Write up to the next step boundary so every window is seen, however large the block
+                room = step_samples - audio_buffer.total_written % step_samples
+                chunk = samples[position:position + room]
+                audio_buffer.write(chunk)
+                position += len(chunk)
+                if audio_buffer.total_written % step_samples:
+                    continue
+
+                end_step = encoder.latest_step(audio_buffer)
+                if end_step is None:
+                    continue
+                window_index = end_step - encoder.steps_per_window
+                start_time = window_index * step_samples / config.samplerate
+                end_time = end_step * step_samples / config.samplerate
+                if config.vad_enabled and not voice_gate.process(audio_buffer.latest_window(step_samples)):
+                    yield window_index, start_time, end_time, None
+                else:
+                    yield window_index, start_time, end_time, encoder.encode(audio_buffer)
+
+
+class BatchAnalyzer:
+    """Scores the windows of recorded files and collects one result row per window."""
+
+    def __init__(self, config, scorer):
+        self.config = config
+        self.scorer = scorer
+        self.relevant_emotions_config = [
+            (name, config.hume_indices[name], color)
+            for name, color in config.emotion_colors.items()
+        ]
+        self.emotion_resolver = EmotionIndexResolver(
+            [name for name, _, _ in self.relevant_emotions_config],
+            [hume_index for _, hume_index, _ in self.relevant_emotions_config]
+        )
+        self.rows = []
+
+    def result_row(self, path, window_index, start_time, end_time, result):
+        """Emotion scores for one window. Silent and unpredicted windows are neutral; the LED
+        state of scored windows is filled in by `apply_led_decisions` once the file is done."""
+        row = {'file': path, 'window': window_index, 'start_s': start_time, 'end_s': end_time,
+               'led_state': None, 'led_emotions': None, 'led_colors': None}
+        for name, _, _ in self.relevant_emotions_config:
+            row[name] = np.nan
+
+        if result is None:
+            row.update(led_state='neutral', led_emotions='Neutral (Silence)', led_colors=LEDController.rgb_to_hex(self.config.neutral_color))
+            return row
+        if 'prosody' not in result or 'predictions' not in result['prosody'] or not result['prosody']['predictions']:
+            row.update(led_state='neutral', led_emotions='Neutral (No Prediction)', led_colors=LEDController.rgb_to_hex(self.config.neutral_color))
+            return row
+
+        scores = self.emotion_resolver.scores(result['prosody']['predictions'][0]['emotions'])
+        for (name, _, _), score in zip(self.relevant_emotions_config, scores.tolist()):
+            row[name] = score
+        return row
+
+    def apply_led_decisions(self, rows):
+        """Fill in the LED state the live runner would show after each window of one file, by
+        replaying the windows in order through the same decision engine (smoothing, enter/exit
+        thresholds, dwell on the window end times) and, in blend mode, the same blending.
+        Windows finish scoring out of order, so this runs once the whole file is scored."""
+        config = self.config
+        engine = create_decision_engine(config, self.relevant_emotions_config)
+        blender = create_color_blender(config, self.relevant_emotions_config)
+        names = [name for name, _, _ in self.relevant_emotions_config]
+        neutral = {'led_state': 'neutral', 'led_emotions': 'Neutral', 'led_colors': LEDController.rgb_to_hex(config.neutral_color)}
+        led = None          # What the LED shows after the previous window
+        blend_lab = None
+        for row in sorted(rows, key=lambda row: row['window']):
+            if row['led_state'] == 'error':
+                continue # The runner skips windows Hume didn't answer; the LED keeps its state
+            if row['led_state'] == 'neutral':
+                engine.reset() # Silence or no prediction set the LED directly, as in the runner
+                led = {key: row[key] for key in neutral}
+                continue
+
+            strong_emotions = engine.update(np.array([row[name] for name in names]), row['end_s'])
+            if blender is not None and engine.shown:
+                blend = next_blend(engine, blender, strong_emotions is not None, blend_lab, config.blend_min_delta)
+                if blend is not None:
+                    color, blend_lab, shown = blend
+                    led = {'led_state': 'blend', 'led_emotions': '+'.join(engine.names[i] for i in shown),
+                           'led_colors': LEDController.rgb_to_hex(tuple(map(int, color)))}
+            elif strong_emotions is not None:
+                if not strong_emotions:
+                    led = neutral
+                else:
+                    led = {'led_state': 'solid' if len(strong_emotions) == 1 else 'blink',
+                           'led_emotions': '+'.join(emotion['name'] for emotion in strong_emotions),
+                           'led_colors': '+'.join(LEDController.rgb_to_hex(emotion['color']) for emotion in strong_emotions)}
+            row.update(led)
+
+    async def _score_window(self, slots, path, window_index, start_time, end_time, encoded_audio):
+        try:
+            result = await self.scorer.score(encoded_audio)
+        except Exception as e:
+            print(f"{path} window {window_index}: scoring failed: {e}", file=sys.stderr)
+            row = self.result_row(path, window_index, start_time, end_time, None)
+            row.update(led_state='error', led_emotions=str(e), led_colors='')
+        else:
+            row = self.result_row(path, window_index, start_time, end_time, result)
+        finally:
+            slots.release()
+        self.rows.append(row)
+
+    async def analyze_file(self, path, concurrency):
+        """Score every window of `path`. Reading pauses while `concurrency` windows are in
+        flight, so only that many encoded windows are held in memory at once."""
+        first_row = len(self.rows)
+        slots = asyncio.Semaphore(concurrency)
+        tasks = []
+        for window_index, start_time, end_time, encoded_audio in iter_windows(path, self.config):
+            if encoded_audio is None:
+                self.rows.append(self.result_row(path, window_index, start_time, end_time, None))
+                continue
+            await slots.acquire()
+            tasks.append(asyncio.ensure_future(
+                self._score_window(slots, path, window_index, start_time, end_time, encoded_audio)))
+            tasks = [task for task in tasks if not task.done()]
+        await asyncio.gather(*tasks)
+        self.apply_led_decisions(self.rows[first_row:])
+
+    async def analyze(self, paths, concurrency):
+        async with self.scorer:
+            for path in paths:
+                num_rows = len(self.rows)
+                print(f"Analyzing {path}...")
+                await self.analyze_file(path, concurrency)
+                print(f"  {len(self.rows) - num_rows} windows")
+        return self.results()
+
+    def results(self):
+        columns = ['file', 'window', 'start_s', 'end_s'] + [name for name, _, _ in self.relevant_emotions_config] \
+            + ['led_state', 'led_emotions', 'led_colors']
+        results = pd.DataFrame(self.rows, columns=columns)
+        return results.sort_values(['file', 'window'], ignore_index=True)
+
+
+def check_output_format(output_path):
+    """Exit with a clear message before any scoring if `output_path` can't be written."""
+    if output_path.lower().endswith('.parquet') and not any(
+            importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet')):
+        print("Error: writing Parquet needs pyarrow (pip install -r requirements-parquet.txt). Use a .csv output instead.")
+        sys.exit(1)
+
+
+def write_results(results, output_path):
+    if output_path.lower().endswith('.parquet'):
+        results.to_parquet(output_path, index=False)
+    else:
+        results.to_csv(output_path, index=False)
+
+
+def create_scorer(args, config):
+    if args.scorer == 'stub':
+        return StubScorer(hume_emotion_names(config.hume_indices), latency=args.stub_latency)
+    from hume.models.config import BurstConfig, ProsodyConfig
+    load_dotenv()
+    hume_stream_client_key = os.getenv("HUME_STREAM_CLIENT_KEY")
+    if not hume_stream_client_key and config.hume_url:
+        hume_stream_client_key = "local" # The stand-in server does not check keys
+    if not hume_stream_client_key:
+        print("Error: HUME_STREAM_CLIENT_KEY environment variable not set.")
+        print("Please set it in your .env file or environment, or use --scorer stub.")
+        sys.exit(1)
+    cache = None
+    if args.cache_path:
+        cache = ResultCache(args.cache_entries, disk_path=args.cache_path, namespace="burst,prosody")
+    return HumeScorer(create_hume_client(hume_stream_client_key, config), [BurstConfig(), ProsodyConfig()],
+                      concurrency=args.concurrency, cache=cache)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score recorded WAV files window by window and write the results to CSV or Parquet.")
+    parser.add_argument('inputs', nargs='+', help="WAV files or directories containing them")
+    parser.add_argument('-o', '--output', default='results.csv', help="Output file (.csv or .parquet)")
+    parser.add_argument('--scorer', choices=['hume', 'stub'], default='hume',
+                        help="'hume' (API) or 'stub' (deterministic local scores, no API key needed)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Windows scored at once (Hume sockets)")
+    parser.add_argument('--stub-latency', type=float, default=0.0, help="Simulated seconds per stub request")
+    parser.add_argument('--hume-url', help="Streaming API base URI, e.g. ws://127.0.0.1:8765 for hume_stand_in.py")
+    parser.add_argument('--cache-path', help="sqlite file of Hume results; re-running over the same files reuses them")
+    parser.add_argument('--cache-entries', type=int, default=1024, help="Cached results kept in memory")
+    parser.add_argument('--samplerate', type=int, help="Rate audio is sent to Hume at (Hz)")
+    parser.add_argument('--window', type=float, dest='window_duration', help="Analysis window (s)")
+    parser.add_argument('--step', type=float, dest='step_duration', help="Time between analyses (s)")
+    parser.add_argument('--threshold', type=float, dest='emotion_threshold', help="Minimum score for an emotion to show")
+    parser.add_argument('--exit-threshold', type=float, dest='emotion_exit_threshold',
+                        help="Score a shown emotion must drop below to turn off (default: 0.8 x --threshold)")
+    parser.add_argument('--smoothing', type=float, dest='emotion_smoothing',
+                        help="Weight of the newest window in the smoothed scores (1.0 disables smoothing)")
+    parser.add_argument('--min-dwell', type=float, dest='emotion_min_dwell', help="Seconds an LED decision is held at least")
+    parser.add_argument('--multi-emotion', choices=['blink', 'blend'], dest='multi_emotion_mode',
+                        help="With several emotions active: 'blink' between the top two or 'blend' all into one color")
+    parser.add_argument('--no-vad', action='store_false', dest='vad_enabled', default=None,
+                        help="Score every window, even silent ones")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    check_output_format(args.output)
+    config_keys = ('samplerate', 'window_duration', 'step_duration', 'emotion_threshold', 'emotion_exit_threshold',
+                   'emotion_smoothing', 'emotion_min_dwell', 'multi_emotion_mode', 'vad_enabled', 'hume_url')
+    overrides = {key: getattr(args, key) for key in config_keys if getattr(args, key) is not None}
+    config = MilaConfig(backend='headless', **overrides)
+
+    paths = find_wav_files(args.inputs)
+    if not paths:
+        print("No WAV files found.")
+        return
+    analyzer = BatchAnalyzer(config, create_scorer(args, config))
+    results = asyncio.run(analyzer.analyze(paths, max(1, args.concurrency)))
+    write_results(results, args.output)
+    print(f"Wrote {len(results)} windows from {len(paths)} files to {args.output}")
+    cache = getattr(analyzer.scorer, 'cache', None)
+    if cache is not None:
+        print(f"Result cache: {cache.stats()}")
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""End-to-end latency benchmark: capture -> encode -> send -> emotion -> LED, without a microphone,
+LED or Hume key.
+
+Audio (synthetic, or a recorded WAV) is fed through MilaRunner.stream_audio_callback in capture-sized
+blocks, windows are encoded as configured, scored by the local stub scorer (or a Hume stand-in
+server with --hume-url) and applied to a headless LED whose writes are timestamped. Each stage's
+wall and CPU time is recorded, and the summary is appended as one JSON line to a results file so
+runs can be compared across commits and machines.
+
+Usage:
+    python benchmark.py --cycles 100
+    python benchmark.py --wav recordings/session.wav --encoder file --stub-latency 0.3
+    python benchmark.py --compare
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+import soundfile as sf
+
+from led_backends import HeadlessLED
+from led_controller import LEDController
+from mila import MilaRunner, create_hume_client, encode_audio
+from mila_config import MilaConfig
+from scorers import HumeScorer, StubScorer, hume_emotion_names
+
+STAGES = ('capture', 'snapshot', 'wav_write', 'base64', 'encode', 'round_trip', 'extract', 'led_first_frame')
+DEFAULT_RESULTS_PATH = os.path.join('benchmarks', 'results.jsonl')
+
+
+class TimestampedLED(HeadlessLED):
+    """Headless LED that remembers when a channel was last written."""
+
+    def __init__(self):
+        super().__init__()
+        self.last_write_time = 0.0
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ('red', 'green', 'blue'):
+            super().__setattr__('last_write_time', time.perf_counter())
+
+
+class StageTimer:
+    """Wall and CPU time samples per stage."""
+
+    def __init__(self):
+        self.wall = {stage: [] for stage in STAGES}
+        self.cpu = {stage: [] for stage in STAGES}
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        yield
+        self.cpu[stage].append(time.process_time() - cpu_start)
+        self.wall[stage].append(time.perf_counter() - wall_start)
+
+    def summary(self):
+        """p50/p95/p99/max wall time and mean CPU time (None if not measured) per stage, in ms."""
+        summary = {}
+        for stage in STAGES:
+            if not self.wall[stage]:
+                continue
+            wall = np.array(self.wall[stage]) * 1000.0
+            p50, p95, p99 = np.percentile(wall, [50, 95, 99]).tolist()
+            summary[stage] = {'n': len(wall), 'p50': p50, 'p95': p95, 'p99': p99, 'max': float(wall.max()),
+                              'cpu_mean': float(np.mean(self.cpu[stage])) * 1000.0 if self.cpu[stage] else None}
+        return summary
+
+
+def synthetic_audio(samplerate, duration, seed=0):
+    """Speech-like test signal: harmonic bursts with a wandering pitch over low noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(samplerate * duration)) / samplerate
+    pitch = 140.0 + 40.0 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / samplerate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 2.5 * t)) * (np.sin(2 * np.pi * 0.2 * t) > -0.6)
+    return (0.2 * voiced * envelope + 0.003 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def audio_blocks(config, cycles, wav_path=None, block_duration=0.1):
+    """Capture-sized blocks (2-D, like sounddevice's indata) at the capture rate, enough for
+    the initial window plus `cycles` steps. A recorded file is looped if it is too short."""
+    samplerate = config.input_samplerate
+    blocksize = int(samplerate * block_duration)
+    needed = int(samplerate * (config.window_duration + cycles * config.step_duration)) + blocksize
+    if wav_path is None:
+        audio = synthetic_audio(samplerate, needed / samplerate)
+    else:
+        audio, file_samplerate = sf.read(wav_path, dtype='float32', always_2d=True, frames=needed)
+        if file_samplerate != samplerate:
+            raise ValueError(f"{wav_path} is {file_samplerate} Hz; pass --capture-samplerate {file_samplerate}")
+        audio = np.resize(audio.mean(axis=1), needed) # Loops the recording
+    for start in range(0, needed - blocksize + 1, blocksize):
+        yield audio[start:start + blocksize, np.newaxis]
+
+
+async def wait_for_led_write(led, after_time, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while led.last_write_time <= after_time:
+        if time.perf_counter() > deadline:
+            return None
+        await asyncio.sleep(0.0005)
+    return led.last_write_time - after_time
+
+
+async def run_benchmark(config, scorer, cycles, wav_path=None):
+    led = TimestampedLED()
+    controller = LEDController(led, is_virtual=False)
+    runner = MilaRunner(config, led_controller=controller)
+    timer = StageTimer()
+    blocks = audio_blocks(config, cycles, wav_path)
+    input_step_samples = int(config.input_samplerate * config.step_duration)
+
+    def capture_step():
+        captured = 0
+        while captured < input_step_samples:
+            block = next(blocks)
+            with timer.measure('capture'):
+                runner.stream_audio_callback(block, len(block), None, None)
+            captured += len(block)
+
+    while len(runner.audio_buffer) < config.window_samples:
+        capture_step()
+
+    controller.start_update_task()
+    async with scorer:
+        for _ in range(cycles):
+            capture_step()
+            cycle_start = time.monotonic()
+
+            if config.audio_encoder == 'file':
+                with timer.measure('snapshot'):
+                    window = runner.audio_buffer.latest_window(config.window_samples)
+                with timer.measure('wav_write'):
+                    sf.write(config.chunk_filename, window, config.samplerate)
+                with timer.measure('base64'):
+                    encoded_audio = encode_audio(config.chunk_filename)
+            elif config.audio_encoder == 'memory':
+                with timer.measure('snapshot'):
+                    window = runner.audio_buffer.latest_window(config.window_samples)
+                with timer.measure('encode'):
+                    encoded_audio = runner.wav_encoder.encode(window)
+            else:
+                with timer.measure('encode'): # Reads the ring buffer directly, no separate snapshot
+                    encoded_audio = runner.windowed_encoder.encode(runner.audio_buffer)
+
+            with timer.measure('round_trip'):
+                result = await scorer.score(encoded_audio)
+            with timer.measure('extract'):
+                runner.apply_hume_result(result, cycle_start)
+            applied_time = time.perf_counter()
+
+            if controller.transition_step == 0: # A new color was set; time the frame that starts showing it
+                latency = await wait_for_led_write(led, applied_time)
+                if latency is not None:
+                    timer.wall['led_first_frame'].append(latency) # CPU is the LED loop's, see the frame stats
+            else:
+                await asyncio.sleep(0)
+
+    runner.tracer.close()
+    if controller.update_task is not None:
+        controller.update_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await controller.update_task
+    return timer.summary(), controller.get_frame_stats()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(stages):
+    print(f"{'stage':<16}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'cpu':>10}  (ms)")
+    for stage, stats in stages.items():
+        cpu = f"{stats['cpu_mean']:>10.3f}" if stats['cpu_mean'] is not None else f"{'-':>10}"
+        print(f"{stage:<16}{stats['n']:>6}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}"
+              f"{stats['max']:>10.3f}{cpu}")
+
+
+def print_comparison(results_path):
+    """One line per stored run with each stage's p50/p95."""
+    with open(results_path) as results_file:
+        runs = [json.loads(line) for line in results_file if line.strip()]
+    for run in runs:
+        print(f"{run['timestamp'][:19]}  {run['commit'] or '-':<9} {run['machine']:<8} {run['config']['audio_encoder']:<9}"
+              + "  ".join(f"{stage} {stats['p50']:.2f}/{stats['p95']:.2f}" for stage, stats in run['stages'].items()))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-stage latency of the Mila pipeline with a stub scorer and headless LED.")
+    parser.add_argument('--cycles', type=int, default=50, help="Windows to analyze")
+    parser.add_argument('--wav', help="Recorded audio to feed instead of the synthetic signal")
+    parser.add_argument('--samplerate', type=int, default=16000)
+    parser.add_argument('--capture-samplerate', type=int, help="Rate blocks are captured at (default: --samplerate)")
+    parser.add_argument('--window', type=float, default=3.0, dest='window_duration')
+    parser.add_argument('--step', type=float, default=1.0, dest='step_duration')
+    parser.add_argument('--encoder', choices=['windowed', 'memory', 'file'], default='windowed', dest='audio_encoder')
+    parser.add_argument('--stub-latency', type=float, default=0.0, help="Simulated seconds per stub request")
+    parser.add_argument('--hume-url', help="Score on a Hume stand-in server instead of the in-process stub")
+    parser.add_argument('--output', default=DEFAULT_RESULTS_PATH, help="JSON lines file the summary is appended to")
+    parser.add_argument('--label', default='', help="Free-form note stored with the results (e.g. 'pi zero, sd card')")
+    parser.add_argument('--compare', action='store_true', help="Print the stored results and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        print_comparison(args.output)
+        return
+
+    config = MilaConfig(backend='headless', samplerate=args.samplerate, capture_samplerate=args.capture_samplerate,
+                        window_duration=args.window_duration, step_duration=args.step_duration,
+                        audio_encoder=args.audio_encoder, vad_enabled=False, hume_url=args.hume_url,
+                        chunk_filename='benchmark_chunk.wav',
+                        # Cycles run back to back, far faster than real time: decide per window
+                        # so LED changes (and led_first_frame) aren't held back by smoothing or dwell
+                        emotion_smoothing=1.0, emotion_min_dwell=0.0)
+    if args.hume_url:
+        from hume.models.config import BurstConfig, ProsodyConfig
+        scorer = HumeScorer(create_hume_client("local", config), [BurstConfig(), ProsodyConfig()], concurrency=1)
+    else:
+        scorer = StubScorer(hume_emotion_names(config.hume_indices), latency=args.stub_latency)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull): # The runner logs every cycle
+        stages, frame_stats = asyncio.run(run_benchmark(config, scorer, args.cycles, args.wav))
+
+    print_summary(stages)
+    print(f"LED frames: {frame_stats}")
+
+    record = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'label': args.label,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'config': {key: getattr(config, key) for key in ('samplerate', 'input_samplerate', 'window_duration',
+                                                         'step_duration', 'audio_encoder')},
+        'scorer': args.hume_url or f"stub ({args.stub_latency}s)",
+        'cycles': args.cycles,
+        'audio': args.wav or 'synthetic',
+        'stages': stages,
+        'led_frames': frame_stats,
+    }
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'a') as results_file:
+        results_file.write(json.dumps(record) + '\n')
+    print(f"Appended results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
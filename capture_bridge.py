@@ -0,0 +1,60 @@
+import asyncio
+
+
+class CaptureBridge:
+    """Wakes the event loop from the audio callback when a step of samples is complete, so
+    analysis runs right on step boundaries instead of polling the buffer length.
+
+    The capture thread calls `notify()` after each `AudioRingBuffer.write`; it costs one
+    integer division and, once per step, a `call_soon_threadsafe`. The loop awaits
+    `wait_for_samples()` or `next_step()`. A total that is not on a step boundary gets its own
+    wakeup when it is reached, rather than waiting for the next boundary.
+    """
+
+    def __init__(self, ring_buffer, step_samples):
+        self.ring_buffer = ring_buffer
+        self.step_samples = int(step_samples)
+        self.loop = None
+        self._event = asyncio.Event()
+        self._notified_step = 0     # Only touched by the capture thread
+        self._target = None         # Total the loop waits for; only written by the loop
+        self._notified_target = None # Last target woken for; only touched by the capture thread
+
+    def notify(self):
+        """Called from the capture thread after new samples were written."""
+        loop = self.loop
+        if loop is None:
+            return # Nobody is waiting yet; waiters check the buffer before sleeping
+        total = self.ring_buffer.total_written
+        step = total // self.step_samples
+        target = self._target
+        target_reached = target is not None and target != self._notified_target and total >= target
+        if step != self._notified_step or target_reached:
+            self._notified_step = step
+            if target_reached:
+                self._notified_target = target
+            loop.call_soon_threadsafe(self._event.set)
+
+    def latest_step(self):
+        """Number of complete steps written so far."""
+        return self.ring_buffer.total_written // self.step_samples
+
+    async def wait_for_samples(self, total):
+        """Wait until at least `total` samples have been written in all."""
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        self._target = total
+        while True:
+            self._event.clear()
+            if self.ring_buffer.total_written >= total:
+                return
+            await self._event.wait()
+
+    async def next_step(self, after_step=None):
+        """Wait for a step boundary past `after_step` and return the newest complete step.
+        If several steps completed meanwhile (the caller was busy), the latest is returned
+        at once and the ones in between are skipped rather than queued."""
+        if after_step is None:
+            after_step = self.latest_step()
+        await self.wait_for_samples((after_step + 1) * self.step_samples)
+        return self.latest_step()
@@ -0,0 +1,65 @@
+import numpy as np
+
+# OKLab (Björn Ottosson, 2020): linear sRGB -> LMS -> cube root -> Lab, and back
+_RGB_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_LMS_TO_LAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LAB_TO_LMS = np.linalg.inv(_LMS_TO_LAB)
+_LMS_TO_RGB = np.linalg.inv(_RGB_TO_LMS)
+
+
+def srgb_to_oklab(rgb):
+    """OKLab coordinates of 0-255 sRGB colors, shape (..., 3)."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return np.cbrt(linear @ _RGB_TO_LMS.T) @ _LMS_TO_LAB.T
+
+
+def oklab_to_srgb(lab):
+    """0-255 sRGB colors (floats, clipped to the gamut) for OKLab coordinates, shape (..., 3)."""
+    linear = np.clip((np.asarray(lab, dtype=np.float64) @ _LAB_TO_LMS.T) ** 3 @ _LMS_TO_RGB.T, 0.0, 1.0)
+    c = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+    return c * 255.0
+
+
+class EmotionColorBlender:
+    """Mixes the colors of several emotions into one, weighted by score, in OKLab so the mix
+    looks like what lies perceptually between them (no muddy or too-dark midpoints as in RGB).
+
+    With `lut_size` > 0 the gradient between every pair of colors is precomputed in that many
+    steps; blends of one or two emotions (the common case) are then a table lookup instead of
+    a color space conversion. Blends of more emotions are always converted exactly.
+    """
+
+    def __init__(self, colors, lut_size=0):
+        self.lab = srgb_to_oklab(colors)    # (emotions, 3)
+        self.lut = None
+        if lut_size:
+            if lut_size < 2:
+                raise ValueError(f"lut_size must be 0 or at least 2, got {lut_size}")
+            t = np.linspace(0.0, 1.0, lut_size)[:, None]
+            # lut[i, j, k] is k/(lut_size-1) of the way from color i to color j
+            gradients = self.lab[:, None, None, :] * (1.0 - t) + self.lab[None, :, None, :] * t
+            self.lut = np.rint(oklab_to_srgb(gradients))
+
+    def blend(self, weights):
+        """The score-weighted mix for `weights` (one per color, zero for emotions left out) as
+        (0-255 RGB list, OKLab coordinates)."""
+        weights = np.asarray(weights, dtype=np.float64)
+        total = weights.sum()
+        if total <= 0.0:
+            raise ValueError("At least one weight must be positive")
+        lab = weights @ self.lab / total
+        present = np.flatnonzero(weights)
+        if self.lut is not None and len(present) <= 2:
+            first, last = present[0], present[-1]
+            step = int(round(weights[last] / total * (self.lut.shape[2] - 1)))
+            return self.lut[first, last, step].tolist(), lab
+        return np.rint(oklab_to_srgb(lab)).tolist(), lab
@@ -0,0 +1,134 @@
+import asyncio
+import base64
+import concurrent.futures
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import soundfile as sf
+
+from wav_encoder import WavEncoder
+
+CYCLE_EXECUTORS = ('inline', 'thread', 'process')
+
+
+class InlineExecutor:
+    """Encodes on the event loop thread (no handoff; fine when encoding is cheap)."""
+
+    async def encode(self, runner):
+        return runner.encode_current_window()
+
+    def close(self):
+        pass
+
+
+class ThreadExecutor:
+    """Encodes on a worker thread, so the event loop (and the LED animation) keeps running
+    between the GIL-releasing parts of the encode instead of waiting for all of it."""
+
+    def __init__(self):
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='mila-encode')
+
+    async def encode(self, runner):
+        encoded, peak = await asyncio.get_running_loop().run_in_executor(self._pool, runner.encode_window)
+        runner.warn_if_silent(peak) # Tracer events are recorded from the loop thread only
+        return encoded
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Room for the WAV header of the 'file' encoder's output, which soundfile writes itself
+MAX_WAV_HEADER_BYTES = 64
+
+# State of a ProcessExecutor worker, set up once per process by _init_worker
+_worker_blocks = None
+_worker_window = None
+_worker_output = None
+_worker_encoder = None
+
+
+def _init_worker(window_name, output_name, window_samples, samplerate, dump_path):
+    global _worker_blocks, _worker_window, _worker_output, _worker_encoder
+    _worker_blocks = (shared_memory.SharedMemory(name=window_name), shared_memory.SharedMemory(name=output_name))
+    _worker_window = np.ndarray((window_samples,), dtype=np.float32, buffer=_worker_blocks[0].buf)
+    _worker_output = _worker_blocks[1].buf
+    _worker_encoder = WavEncoder(samplerate, dump_path=dump_path)
+
+
+def _encode_shared_window(num_samples, audio_encoder, chunk_filename, check_silence):
+    """Runs in the worker: encode the first `num_samples` of the shared window into the shared
+    output block. Returns (length of the base64 WAV, peak amplitude or None)."""
+    window = _worker_window[:num_samples]
+    peak = float(np.max(np.abs(window))) if check_silence else None
+    if audio_encoder == 'file':
+        sf.write(chunk_filename, window, _worker_encoder.samplerate)
+        with open(chunk_filename, 'rb') as audio_file:
+            encoded = base64.b64encode(audio_file.read())
+    else:
+        encoded = _worker_encoder.encode(window)
+    _worker_output[:len(encoded)] = encoded
+    return len(encoded), peak
+
+
+class ProcessExecutor:
+    """Encodes in a separate process, off the interpreter running the event loop and LED.
+
+    Audio and result travel through two shared memory blocks instead of being pickled: the
+    window is copied from the ring buffer into one, the worker encodes it and writes the base64
+    WAV into the other, and only its length comes back through the pool. The worker encodes
+    the whole window each cycle, so with the 'windowed' encoder the window is the same but its
+    per-step cache is not used.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.window_samples = config.window_samples
+        output_bytes = 4 * -(-(MAX_WAV_HEADER_BYTES + 2 * self.window_samples) // 3) # Base64 of 16-bit PCM
+        self._window_block = shared_memory.SharedMemory(create=True, size=self.window_samples * 4)
+        self._output_block = shared_memory.SharedMemory(create=True, size=output_bytes)
+        self._window = np.ndarray((self.window_samples,), dtype=np.float32, buffer=self._window_block.buf)
+        dump_path = config.chunk_filename if config.debug_dump_chunks else None
+        # 'spawn' because the parent runs threads (audio callback, tracer, LED backends)
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+            initargs=(self._window_block.name, self._output_block.name, self.window_samples,
+                      config.samplerate, dump_path))
+
+    async def encode(self, runner):
+        config = self.config
+        if config.audio_encoder == 'windowed':
+            # Same window the windowed encoder would send: whole steps, ending on a step boundary
+            encoder = runner.windowed_encoder
+            num_samples = encoder.window_samples
+            end_step = encoder.latest_step(runner.audio_buffer)
+            if end_step is None:
+                raise ValueError("Not enough audio buffered for a full window")
+            end = end_step * encoder.step_samples
+            runner.audio_buffer.read(end - num_samples, end, out=self._window[:num_samples])
+        else:
+            num_samples = self.window_samples
+            runner.audio_buffer.latest_window(num_samples, out=self._window)
+        # Awaiting the worker also keeps the next cycle from overwriting the blocks while it uses them
+        length, peak = await asyncio.get_running_loop().run_in_executor(
+            self._pool, _encode_shared_window, num_samples, config.audio_encoder, config.chunk_filename,
+            config.silence_warning_amplitude is not None)
+        runner.warn_if_silent(peak)
+        return bytes(self._output_block.buf[:length])
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._window = None
+        for block in (self._window_block, self._output_block):
+            block.close()
+            block.unlink()
+
+
+def create_cycle_executor(config):
+    if config.cycle_executor == 'thread':
+        return ThreadExecutor()
+    if config.cycle_executor == 'process':
+        return ProcessExecutor(config)
+    if config.cycle_executor == 'inline':
+        return InlineExecutor()
+    raise ValueError(f"Unknown cycle executor '{config.cycle_executor}'. Choose from: {', '.join(CYCLE_EXECUTORS)}")
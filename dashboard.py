@@ -0,0 +1,254 @@
+"""Dashboard: many virtual Milas in one window with a single render loop.
+
+Usage:
+    python dashboard.py --simulate 24 --columns 6
+    python dashboard.py --wav recordings/ --scorer stub   # one panel per recording
+"""
+import argparse
+import asyncio
+import os
+import queue
+import sys
+import time
+import tkinter as tk
+
+import numpy as np
+
+from batch_analysis import create_scorer, find_wav_files, iter_windows
+from led_controller import LEDAnimationClock, LEDController
+from mila import MilaRunner
+from mila_config import MilaConfig
+from scorers import hume_emotion_names, synthetic_prosody_result
+from tk_visualizer import RenderWorkerClient
+from tracing import create_tracer
+
+PANEL_WIDTH = 170
+PANEL_HEIGHT = 190
+
+
+class DashboardCanvas:
+    """All panels drawn on one Tk canvas: title, LED circle, status text and small emotion bars.
+
+    Canvas items are created once per panel and updated in place. Must be used only from
+    the thread running the Tk event loop.
+    """
+
+    def __init__(self, root, num_panels, columns, titles):
+        self.root = root
+        self.columns = columns
+        rows = -(-num_panels // columns)
+        self.canvas = tk.Canvas(root, width=columns * PANEL_WIDTH, height=rows * PANEL_HEIGHT, bg="gray20")
+        self.canvas.pack()
+
+        self.panels = []
+        for index in range(num_panels):
+            x = (index % columns) * PANEL_WIDTH
+            y = (index // columns) * PANEL_HEIGHT
+            self.canvas.create_text(x + PANEL_WIDTH / 2, y + 10, text=titles[index], fill="white", font=("Helvetica", 9))
+            led_id = self.canvas.create_oval(x + 60, y + 22, x + 110, y + 72, fill="#000000", outline="gray50")
+            label_id = self.canvas.create_text(x + PANEL_WIDTH / 2, y + 84, text="", fill="white", font=("Helvetica", 9))
+            self.panels.append({'x': x, 'y': y, 'led': led_id, 'label': label_id, 'bars': [], 'bar_state': []})
+
+    def set_led(self, index, fill, label_text):
+        panel = self.panels[index]
+        self.canvas.itemconfig(panel['led'], fill=fill)
+        self.canvas.itemconfig(panel['label'], text=label_text)
+
+    def set_emotion_bars(self, index, emotion_data):
+        panel = self.panels[index]
+        x0 = panel['x'] + 10
+        bar_max_width = PANEL_WIDTH - 20
+        if len(panel['bars']) != len(emotion_data):
+            for rect_id in panel['bars']:
+                self.canvas.delete(rect_id)
+            panel['bars'] = []
+            for i in range(len(emotion_data)):
+                y0 = panel['y'] + 98 + i * 14
+                panel['bars'].append(self.canvas.create_rectangle(x0, y0, x0, y0 + 10, fill="#808080", outline=""))
+            panel['bar_state'] = [None] * len(emotion_data)
+
+        for i, (rect_id, (name, score, bar_color_hex)) in enumerate(zip(panel['bars'], emotion_data)):
+            if panel['bar_state'][i] == (score, bar_color_hex):
+                continue # Unchanged since the last update
+            y0 = panel['y'] + 98 + i * 14
+            self.canvas.coords(rect_id, x0, y0, x0 + score * bar_max_width, y0 + 10)
+            self.canvas.itemconfig(rect_id, fill=bar_color_hex)
+            panel['bar_state'][i] = (score, bar_color_hex)
+
+
+def run_dashboard(inbox, num_panels, columns, frame_rate, titles):
+    """Render loop: once per frame, drain every panel's queued updates and apply the newest
+    state of each in one batch, so Tk redraws the canvas once per frame."""
+    root = tk.Tk()
+    root.title(f"Mila dashboard ({num_panels} streams)")
+    dashboard = DashboardCanvas(root, num_panels, columns, titles)
+    frame_ms = max(1, int(1000 / frame_rate))
+
+    def poll():
+        led_states = {}
+        bar_states = {}
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'led':
+                led_states[message[1]] = message[2:]
+            elif message[0] == 'bars':
+                bar_states[message[1]] = message[2]
+            elif message[0] == 'close':
+                root.destroy()
+                return
+        for index, (fill, label_text) in led_states.items():
+            dashboard.set_led(index, fill, label_text)
+        for index, emotion_data in bar_states.items():
+            dashboard.set_emotion_bars(index, emotion_data)
+        root.after(frame_ms, poll)
+
+    root.after(frame_ms, poll)
+    root.mainloop()
+
+
+class DashboardPanel:
+    """One panel of a DashboardVisualizer; pass it to LEDController as `visualizer`."""
+
+    def __init__(self, dashboard, index):
+        self.dashboard = dashboard
+        self.index = index
+
+    def set_led(self, fill, label_text):
+        self.dashboard._post(('led', self.index, fill, label_text))
+
+    def set_emotion_bars(self, emotion_data):
+        self.dashboard._post(('bars', self.index, tuple(emotion_data)))
+
+    def close(self):
+        pass # Panels live as long as the dashboard
+
+
+class DashboardVisualizer(RenderWorkerClient):
+    """Hosts `num_panels` virtual LEDs in one window, rendered by a single Tk loop in its own
+    thread (or process), instead of one Tk root and event loop per virtual Mila."""
+
+    def __init__(self, num_panels, columns=6, frame_rate=30, use_process=False, titles=None):
+        self.num_panels = num_panels
+        self.frame_rate = frame_rate
+        if titles is None:
+            titles = [f"Mila {i + 1}" for i in range(num_panels)]
+        columns = max(1, min(columns, num_panels))
+        super().__init__(run_dashboard, (num_panels, columns, frame_rate, titles), use_process)
+
+    @property
+    def is_open(self):
+        return self._worker.is_alive()
+
+    def panel(self, index):
+        return DashboardPanel(self, index)
+
+    def create_led_controllers(self, **kwargs):
+        """One virtual LEDController per panel, all animated by one shared LEDAnimationClock."""
+        clock = LEDAnimationClock(self.frame_rate)
+        return [LEDController(is_virtual=True, visualizer=self.panel(i), clock=clock, **kwargs)
+                for i in range(self.num_panels)]
+
+
+class SimulatedStream:
+    """Produces Hume-shaped prosody results whose scores for the configured emotions follow
+    a slow random walk, for demoing and load-testing without audio or an API key."""
+
+    finished = False
+
+    def __init__(self, config, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.names = hume_emotion_names(config.hume_indices)
+        self.scores = self.rng.uniform(0.0, 0.15, len(self.names))
+
+    async def next_result(self):
+        self.scores = np.clip(self.scores + self.rng.normal(0.0, 0.03, len(self.scores)), 0.0, 1.0)
+        return synthetic_prosody_result(self.names, self.scores.tolist())
+
+
+class RecordedStream:
+    """Replays a WAV file window by window through `scorer`, sliced the same way as in
+    `batch_analysis.py`, so a panel shows what a Mila listening to the recording would show.
+    `next_result()` returns None for a silent window; `finished` is set after the last one."""
+
+    def __init__(self, path, config, scorer):
+        self.path = path
+        self.scorer = scorer
+        self._windows = iter_windows(path, config)
+        self.finished = False
+
+    async def next_result(self):
+        window = next(self._windows, None)
+        if window is None:
+            self.finished = True
+            return None
+        encoded_audio = window[3]
+        if encoded_audio is None:
+            return None
+        return await self.scorer.score(encoded_audio)
+
+
+async def run_streams(streams, columns, config, titles=None):
+    """Feed each stream's results to its own runner and panel, one result per stream every
+    `config.step_duration` seconds, until every stream is finished and the window is closed."""
+    dashboard = DashboardVisualizer(len(streams), columns=columns, titles=titles)
+    tracer = create_tracer(config) # One flush thread for all streams
+    runners = [MilaRunner(config, led_controller=controller, tracer=tracer) for controller in dashboard.create_led_controllers()]
+    runners[0].led_controller.start_update_task() # Starts the shared clock for every panel
+
+    next_cycle_time = time.monotonic()
+    while not all(stream.finished for stream in streams):
+        current_cycle_log_time_ref = time.monotonic()
+        active = [(runner, stream) for runner, stream in zip(runners, streams) if not stream.finished]
+        results = await asyncio.gather(*(stream.next_result() for _, stream in active), return_exceptions=True)
+        for (runner, stream), result in zip(active, results):
+            if isinstance(result, Exception):
+                tracer.log(f"{getattr(stream, 'path', 'stream')}: scoring failed: {result}", current_cycle_log_time_ref)
+            elif result is None:
+                if not stream.finished:
+                    runner.show_silence()
+            else:
+                runner.apply_hume_result(result, current_cycle_log_time_ref)
+        next_cycle_time += config.step_duration
+        await asyncio.sleep(max(0.0, next_cycle_time - time.monotonic()))
+
+    tracer.log("All recordings replayed; close the window to exit.")
+    while dashboard.is_open:
+        await asyncio.sleep(0.5)
+
+
+async def run_recorded(paths, columns, config, scorer):
+    async with scorer:
+        await run_streams([RecordedStream(path, config, scorer) for path in paths], columns, config,
+                          titles=[os.path.basename(path) for path in paths])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Show many Mila streams in one window.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--simulate', type=int, metavar='N', help="Number of simulated streams (default 12)")
+    source.add_argument('--wav', nargs='+', metavar='PATH',
+                        help="Replay WAV files (or directories of them) through the scorer, one panel per file")
+    parser.add_argument('--columns', type=int, default=6)
+    parser.add_argument('--step', type=float, default=1.0, help="Seconds between results")
+    parser.add_argument('--scorer', choices=['hume', 'stub'], default='hume',
+                        help="Scorer for --wav: 'hume' (API) or 'stub' (deterministic local scores, no API key needed)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Windows scored at once with --wav (Hume sockets)")
+    parser.add_argument('--stub-latency', type=float, default=0.0, help="Simulated seconds per stub request")
+    parser.add_argument('--hume-url', help="Streaming API base URI, e.g. ws://127.0.0.1:8765 for hume_stand_in.py")
+    parser.add_argument('--cache-path', help="sqlite file of Hume results, reused when the same recordings are replayed")
+    parser.add_argument('--cache-entries', type=int, default=1024, help="Cached results kept in memory")
+    args = parser.parse_args()
+    config = MilaConfig.for_virtual(step_duration=args.step, hume_url=args.hume_url)
+    if args.wav:
+        paths = find_wav_files(args.wav)
+        if not paths:
+            print("No WAV files found.")
+            sys.exit(1)
+        asyncio.run(run_recorded(paths, args.columns, config, create_scorer(args, config)))
+    else:
+        num_streams = args.simulate or 12
+        streams = [SimulatedStream(config, seed=i) for i in range(num_streams)]
+        asyncio.run(run_streams(streams, args.columns, config))
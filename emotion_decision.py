@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class EmotionDecisionEngine:
+    """Decides what the LED shows from a stream of per-window emotion scores, without the
+    flip-flopping of thresholding each window on its own.
+
+    Scores are smoothed across cycles with an exponential moving average (`smoothing` is the
+    weight of the newest window; 1.0 disables smoothing). An emotion turns on when its smoothed
+    score reaches `enter_threshold` and only turns off again below `exit_threshold`. The shown
+    decision (neutral, or the strongest active emotions) is held for at least `min_dwell`
+    seconds, less half of `step` (the time between windows), so a window arriving a sample or a
+    clock tick before the dwell is over still counts. `max_shown` limits how many emotions a
+    decision holds (None: all active ones).
+    `update()` returns the new decision only when it changes, so the LED controller is
+    not called (and no transition restarts) while the decision stays the same.
+    """
+
+    def __init__(self, names, colors, enter_threshold, exit_threshold=None, smoothing=0.5, min_dwell=1.0,
+                 max_shown=2, step=0.0):
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError(f"smoothing must be in (0, 1], got {smoothing}")
+        self.names = list(names)
+        self.colors = list(colors)
+        self.enter_threshold = enter_threshold
+        # Default exit threshold: a little below the enter threshold
+        self.exit_threshold = 0.8 * enter_threshold if exit_threshold is None else exit_threshold
+        if self.exit_threshold > enter_threshold:
+            raise ValueError(f"exit_threshold ({self.exit_threshold}) must not exceed enter_threshold ({enter_threshold})")
+        self.smoothing = smoothing
+        self.min_dwell = min_dwell
+        self.step = step
+        self.max_shown = max_shown
+
+        self.smoothed = np.zeros(len(self.names))
+        self.active = np.zeros(len(self.names), dtype=bool)
+        self._primed = False            # False until the first scores after a reset
+        self._entering = np.zeros(len(self.names), dtype=bool)
+        self._staying = np.zeros(len(self.names), dtype=bool)
+        self.shown = None               # Indices of the emotions on the LED (empty: neutral); None until the first decision
+        self.shown_since = float('-inf')
+
+        # Counters
+        self.updates = 0
+        self.changes = 0
+
+    def update(self, scores, now):
+        """Feed one window's scores (in `names` order) at time `now` (s).
+
+        Returns the new decision as a list of dicts with name/score/color, strongest first (empty
+        for neutral, at most `max_shown`), or None if the LED should keep showing what it shows.
+        """
+        self.updates += 1
+        if self._primed:
+            self.smoothed += self.smoothing * (np.asarray(scores, dtype=np.float64) - self.smoothed)
+        else:
+            self.smoothed[:] = scores
+            self._primed = True
+
+        # Hysteresis: active emotions stay on down to the exit threshold, others need the enter threshold
+        np.greater_equal(self.smoothed, self.enter_threshold, out=self._entering)
+        np.greater_equal(self.smoothed, self.exit_threshold, out=self._staying)
+        self._staying &= self.active
+        np.logical_or(self._entering, self._staying, out=self.active)
+
+        candidates = np.flatnonzero(self.active)
+        strongest = candidates[np.argsort(-self.smoothed[candidates], kind='stable')[:self.max_shown]]
+        decision = frozenset(strongest.tolist())
+        if decision == self.shown or now - self.shown_since < self.min_dwell - self.step / 2:
+            return None
+
+        self.shown = decision
+        self.shown_since = now
+        self.changes += 1
+        return [{'name': self.names[i], 'score': float(self.smoothed[i]), 'color': self.colors[i]} for i in strongest]
+
+    def reset(self):
+        """Forget the smoothed scores after the LED was set elsewhere (silence, no prediction).
+        The next decision is shown immediately, whatever it is."""
+        self._primed = False
+        self.active[:] = False
+        self.shown = None
+        self.shown_since = float('-inf')
+
+    def stats(self):
+        return {'updates': self.updates, 'changes': self.changes}
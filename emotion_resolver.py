@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class EmotionIndexResolver:
+    """Finds the configured emotions in Hume's prosody emotion list once, instead of
+    searching the ~48 entries by name for every emotion on every cycle.
+
+    The name -> position mapping is built from the first response and checked against the
+    configured fallback indices. Later responses are only checked at the resolved
+    positions (list length plus one name comparison per emotion); the mapping is rebuilt
+    only when that check fails, i.e. when Hume changes the response schema.
+    """
+
+    def __init__(self, names, fallback_indices, log=print):
+        self.names = list(names)
+        self.log = log
+        self.fallback_indices = list(fallback_indices)
+        self.indices = None         # Resolved position of each emotion, -1 if not present
+        self.rebuilds = 0
+        self._expected_names = []   # (position, name) pairs that must hold for the mapping to be valid
+        self._num_emotions = None
+
+    def _matches(self, emotions):
+        if len(emotions) != self._num_emotions:
+            return False
+        for position, name in self._expected_names:
+            if emotions[position]['name'] != name:
+                return False
+        return True
+
+    def _build(self, emotions):
+        positions = {e['name'].lower(): i for i, e in enumerate(emotions)}
+        indices = []
+        self._expected_names = []
+        for name, fallback_index in zip(self.names, self.fallback_indices):
+            position = positions.get(name.lower())
+            if position is None:
+                # Fall back to the configured index if the name is not found (Hume might change names)
+                position = fallback_index if fallback_index < len(emotions) else -1
+                self.log(f"Warning: Hume emotion '{name}' not found by name, using index {position}.")
+            else:
+                self._expected_names.append((position, emotions[position]['name']))
+                if position != fallback_index:
+                    self.log(f"Warning: Hume emotion '{name}' is at index {position}, not the configured index {fallback_index}.")
+            indices.append(position)
+
+        self.indices = np.array(indices, dtype=np.intp)
+        self._num_emotions = len(emotions)
+        self.rebuilds += 1
+
+    def scores(self, emotions):
+        """Return the configured emotions' scores from a Hume `emotions` list as a float array."""
+        if self.indices is None or not self._matches(emotions):
+            self._build(emotions)
+        return np.array([emotions[i]['score'] if i >= 0 else 0.0 for i in self.indices], dtype=np.float64)
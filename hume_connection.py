@@ -0,0 +1,227 @@
+import asyncio
+import collections
+import contextlib
+import random
+import time
+
+import websockets.exceptions
+from hume import HumeClientException
+
+
+class Backoff:
+    """Exponential backoff with jitter: `initial`, `initial * factor`, ... capped at `maximum`,
+    each shortened by a random fraction of up to `jitter` so many clients don't retry in step."""
+
+    def __init__(self, initial=0.25, maximum=10.0, factor=2.0, jitter=0.5):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next_delay(self):
+        delay = min(self.maximum, self.initial * self.factor ** self.attempts)
+        self.attempts += 1
+        return delay * (1.0 - self.jitter * random.random())
+
+    def reset(self):
+        self.attempts = 0
+
+
+class HumeConnection:
+    """One open streaming socket and the exit stack that closes it."""
+
+    def __init__(self, socket, exit_stack):
+        self.socket = socket
+        self.exit_stack = exit_stack
+        self.lock = asyncio.Lock()      # One request at a time per socket
+        self.last_used = time.monotonic()
+
+
+class HumeConnectionManager:
+    """Keeps a Hume streaming connection up across network hiccups.
+
+    `send()` uses the active connection; if it is lost, a pre-opened standby connection takes
+    over at once and a new standby is opened in the background. Only when both are gone does
+    `send()` return None (the caller skips the window and keeps the LED as it is) while a
+    background task reconnects with exponential backoff and jitter. Idle connections are kept
+    alive with a cheap `job_details` request every `keepalive_interval` seconds.
+
+    With `reset_stream='auto'` the connection is opened with `stream_window_ms` (the analysis
+    window) so the server's sliding window never holds more than the latest payload, and the
+    stream is only reset after the server rejects a payload. `'always'` resets before every send.
+    Connection events go to `log` (e.g. a Tracer's `log`, so they stay off the event loop).
+    """
+
+    def __init__(self, client, configs, stream_window_ms=None, reset_stream='auto', standby=True,
+                 keepalive_interval=20.0, backoff_initial=0.25, backoff_max=10.0, log=print):
+        if reset_stream not in ('auto', 'always'):
+            raise ValueError(f"Unknown reset_stream policy '{reset_stream}'. Choose 'auto' or 'always'.")
+        self.client = client
+        self.configs = configs
+        self.stream_window_ms = stream_window_ms
+        self.reset_stream = reset_stream
+        self.use_standby = standby
+        self.keepalive_interval = keepalive_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.log = log
+
+        self._active = None
+        self._standby = None
+        self._wakeup = asyncio.Event()
+        self._connected = asyncio.Event()   # Set while an active connection is up
+        self._tasks = []
+        self._down_since = None
+
+        # Counters
+        self.reconnects = 0     # Connections opened after the first, standbys included
+        self.failovers = 0      # Lost active connections replaced by the standby without downtime
+        self.downtimes = collections.deque(maxlen=100) # Seconds without any connection, per incident
+
+    async def __aenter__(self):
+        self._active = await self._open_with_backoff()
+        self._connected.set()
+        self._tasks = [asyncio.create_task(self._maintain())]
+        if self.keepalive_interval:
+            self._tasks.append(asyncio.create_task(self._keepalive()))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for connection in (self._active, self._standby):
+            if connection is not None:
+                await self._close(connection)
+        self._active = self._standby = None
+        self._connected.clear()
+
+    @property
+    def is_connected(self):
+        return self._active is not None
+
+    async def wait_connected(self):
+        """Wait until a connection is up (the background task reconnects with backoff)."""
+        await self._connected.wait()
+
+    async def send(self, encoded_audio):
+        """Hume's response for `encoded_audio`, or None if no connection is up right now."""
+        for _ in range(2): # A lost connection is retried once on the standby
+            connection = self._active
+            if connection is None:
+                return None
+            try:
+                async with connection.lock:
+                    if self.reset_stream == 'always':
+                        await connection.socket.reset_stream()
+                    try:
+                        result = await connection.socket.send_bytes(encoded_audio)
+                    except HumeClientException:
+                        if self.reset_stream == 'always':
+                            raise
+                        # The server rejected the payload: reset the stream and retry once
+                        await connection.socket.reset_stream()
+                        result = await connection.socket.send_bytes(encoded_audio)
+                    connection.last_used = time.monotonic()
+                    return result
+            except (websockets.exceptions.ConnectionClosed, OSError) as e:
+                self._connection_lost(connection, e)
+        return None
+
+    def _connection_lost(self, connection, error):
+        if connection is self._active:
+            if self._standby is not None:
+                self._active, self._standby = self._standby, None
+                self.failovers += 1
+                self.log(f"[connection] Hume connection lost ({error}); switched to standby connection.")
+            else:
+                self._active = None
+                self._connected.clear()
+                self._down_since = time.monotonic()
+                self.log(f"[connection] Hume connection lost ({error}); reconnecting...")
+        elif connection is self._standby:
+            self._standby = None
+        else:
+            return # Already handled
+        asyncio.create_task(self._close(connection))
+        self._wakeup.set()
+
+    async def _open(self):
+        exit_stack = contextlib.AsyncExitStack()
+        connect_kwargs = {}
+        if self.stream_window_ms is not None:
+            connect_kwargs['stream_window_ms'] = self.stream_window_ms
+        try:
+            socket = await exit_stack.enter_async_context(self.client.connect(self.configs, **connect_kwargs))
+        except BaseException:
+            await exit_stack.aclose()
+            raise
+        return HumeConnection(socket, exit_stack)
+
+    async def _open_with_backoff(self):
+        backoff = Backoff(self.backoff_initial, self.backoff_max)
+        while True:
+            try:
+                return await self._open()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = backoff.next_delay()
+                self.log(f"[connection] Could not connect to Hume ({e}). Retrying in {delay:.2f}s (attempt {backoff.attempts}).")
+                await asyncio.sleep(delay)
+
+    async def _close(self, connection):
+        with contextlib.suppress(Exception):
+            await connection.exit_stack.aclose()
+
+    async def _maintain(self):
+        """Reopen the active connection when it is lost and keep a standby ready."""
+        while True:
+            if self._active is None or (self.use_standby and self._standby is None):
+                connection = await self._open_with_backoff()
+                self.reconnects += 1
+                if self._active is None:
+                    self._active = connection
+                    self._connected.set()
+                    if self._down_since is not None:
+                        downtime = time.monotonic() - self._down_since
+                        self.downtimes.append(downtime)
+                        self._down_since = None
+                        self.log(f"[connection] Reconnected to Hume after {downtime:.2f}s.")
+                elif self.use_standby and self._standby is None:
+                    self._standby = connection
+                else:
+                    await self._close(connection)
+                continue
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _keepalive(self):
+        """Send a cheap request on connections idle for `keepalive_interval`, so the server and
+        any NAT in between don't drop them, and a dead standby is noticed before it is needed."""
+        while True:
+            await asyncio.sleep(self.keepalive_interval / 2)
+            for connection in (self._active, self._standby):
+                if connection is None or connection.lock.locked():
+                    continue
+                if time.monotonic() - connection.last_used < self.keepalive_interval:
+                    continue
+                try:
+                    async with connection.lock:
+                        await connection.socket.get_job_details()
+                        connection.last_used = time.monotonic()
+                except (websockets.exceptions.ConnectionClosed, OSError, HumeClientException) as e:
+                    self._connection_lost(connection, e)
+
+    def stats(self):
+        downtimes = list(self.downtimes)
+        return {
+            'connected': self.is_connected,
+            'standby_ready': self._standby is not None,
+            'reconnects': self.reconnects,
+            'failovers': self.failovers,
+            'incidents': len(downtimes),
+            'total_downtime': sum(downtimes),
+            'max_downtime': max(downtimes) if downtimes else 0.0,
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import contextlib
+import time
+
+from hume import HumeClientException
+
+
+class HumePipeline:
+    """Keeps several Hume streaming requests in flight so the analysis cadence is not
+    limited by the API round trip.
+
+    A pool of `depth` sockets is opened with `client.connect`. `dispatch()` sends a window
+    on an idle socket and returns immediately; when every socket is busy the window is
+    skipped. Results are handed to `on_result(result, seq)` in dispatch order: a response
+    that arrives after a newer one has already been applied is stale and dropped.
+    A payload Hume rejects is retried once after a stream reset and otherwise skipped; a
+    connection failure is re-raised from the next `dispatch()` call so the caller's
+    reconnect handling still applies. With a `ResultCache`, windows that were already
+    scored are answered from it without using a socket. Sockets are opened with
+    `stream_window_ms` if given; `reset_stream=False` skips the reset before each send.
+    Per-request messages go to `log` (e.g. a Tracer's `log`, so they stay off the event loop).
+    """
+
+    def __init__(self, client, configs, depth=2, on_result=None, cache=None, stream_window_ms=None, reset_stream=True,
+                 log=print):
+        self.client = client
+        self.configs = configs
+        self.depth = max(1, int(depth))
+        self.on_result = on_result
+        self.cache = cache
+        self.stream_window_ms = stream_window_ms
+        self.reset_stream = reset_stream
+        self.log = log
+
+        self._exit_stack = None
+        self._idle_sockets = []
+        self._tasks = set()
+        self._error = None
+        self._next_seq = 0
+        self._last_applied_seq = -1
+
+        # Counters for sizing the pool
+        self.dispatched = 0
+        self.skipped_busy = 0
+        self.dropped_stale = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        self._exit_stack = contextlib.AsyncExitStack()
+        connect_kwargs = {}
+        if self.stream_window_ms is not None:
+            connect_kwargs['stream_window_ms'] = self.stream_window_ms
+        try:
+            for _ in range(self.depth):
+                socket = await self._exit_stack.enter_async_context(self.client.connect(self.configs, **connect_kwargs))
+                self._idle_sockets.append(socket)
+        except BaseException:
+            await self._exit_stack.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._idle_sockets.clear()
+        await self._exit_stack.aclose()
+
+    @property
+    def in_flight(self):
+        return len(self._tasks)
+
+    def dispatch(self, encoded_audio):
+        """Send `encoded_audio` on an idle socket. Returns the request's sequence number,
+        or None if all sockets were busy and the window was skipped."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(encoded_audio)
+            result = self.cache.get(cache_key)
+            if result is not None:
+                seq = self._next_seq
+                self._next_seq += 1
+                self._apply(result, seq, 0.0, "cache hit")
+                return seq
+
+        if not self._idle_sockets:
+            self.skipped_busy += 1
+            self.log(f"[pipeline] All {self.depth} sockets busy, skipping window ({self.skipped_busy} skipped so far).")
+            return None
+
+        socket = self._idle_sockets.pop()
+        seq = self._next_seq
+        self._next_seq += 1
+        self.dispatched += 1
+        task = asyncio.create_task(self._request(socket, seq, encoded_audio, cache_key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return seq
+
+    async def _request(self, socket, seq, encoded_audio, cache_key=None):
+        send_time = time.monotonic()
+        try:
+            if self.reset_stream:
+                await socket.reset_stream()
+            try:
+                result = await socket.send_bytes(encoded_audio)
+            except HumeClientException:
+                if self.reset_stream:
+                    raise
+                # The server rejected the payload: reset the stream and retry once on this socket
+                await socket.reset_stream()
+                result = await socket.send_bytes(encoded_audio)
+        except asyncio.CancelledError:
+            raise
+        except HumeClientException as e:
+            # Rejected again; the socket itself is fine, so only this window is lost
+            self.rejected += 1
+            self._idle_sockets.append(socket)
+            self.log(f"[pipeline] Request #{seq} rejected by Hume ({e}), skipping window.")
+            return
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+            return # Connection-level failure: the socket is not returned to the pool; the caller reconnects
+        latency = time.monotonic() - send_time
+        self._idle_sockets.append(socket)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        self._apply(result, seq, latency, f"{self.in_flight - 1} still in flight")
+
+    def _apply(self, result, seq, latency, note):
+        if seq < self._last_applied_seq:
+            self.dropped_stale += 1
+            self.log(f"[pipeline] Request #{seq} took {latency:.3f}s, dropped as stale (#{self._last_applied_seq} already applied).")
+            return
+        self._last_applied_seq = seq
+        self.log(f"[pipeline] Request #{seq} took {latency:.3f}s ({note}).")
+        if self.on_result is not None:
+            self.on_result(result, seq)
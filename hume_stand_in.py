@@ -0,0 +1,142 @@
+"""Local stand-in for Hume's streaming API, for load, latency and reconnect testing without
+a key or network.
+
+It speaks the part of the protocol that HumeStreamClient uses (`reset_stream`,
+`get_job_details` and `send_bytes` JSON messages on /v0/stream/models) and answers
+with synthetic prosody predictions derived from the audio, so identical windows get
+identical scores.
+
+Usage:
+    python hume_stand_in.py --port 8765 --latency 0.4 --jitter 0.1 --error-rate 0.02 --drop-rate 0.01
+    python mila.py --backend headless --hume-url ws://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import websockets
+
+from mila_config import DEFAULT_HUME_INDICES
+from scorers import StubScorer, hume_emotion_names
+
+# Number of emotions in Hume's prosody model
+HUME_PROSODY_EMOTIONS = 48
+
+
+class HumeStandInServer:
+    """Websocket server answering like Hume's streaming endpoint.
+
+    Each `send_bytes` request is answered after `latency` seconds plus normally distributed
+    `jitter` (standard deviation, s). With probability `error_rate` the answer is a Hume error
+    message (the client raises HumeClientException) and with probability `drop_rate` the
+    connection is closed without an answer (the client sees ConnectionClosedError).
+    `seed` makes the latency, error and drop sequence reproducible.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, latency=0.3, jitter=0.0, error_rate=0.0,
+                 drop_rate=0.0, seed=None, names=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        if names is None:
+            names = hume_emotion_names(DEFAULT_HUME_INDICES)
+            names += [f"Other {i}" for i in range(len(names), HUME_PROSODY_EMOTIONS)]
+        self.scorer = StubScorer(names)
+        self._server = None
+
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self.drops = 0
+
+    @property
+    def url(self):
+        """Base URI to pass to HumeStreamClient as `_api_ws_base_uri`."""
+        return f"ws://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        if self.port == 0: # Pick up the port the OS chose
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, websocket, path=None):
+        self.connections += 1
+        try:
+            async for message in websocket:
+                payload = json.loads(message)
+                if payload.get('reset_stream'):
+                    await websocket.send(json.dumps({}))
+                    continue
+                if payload.get('job_details'):
+                    await websocket.send(json.dumps({'job_details': {'job_id': f"stand-in-{self.connections}"}}))
+                    continue
+                if 'data' not in payload:
+                    await websocket.send(json.dumps({'error': "Unsupported request", 'code': 'E0100'}))
+                    continue
+
+                self.requests += 1
+                delay = max(0.0, self.rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+                roll = self.rng.random()
+                await asyncio.sleep(delay)
+                if roll < self.drop_rate:
+                    self.drops += 1
+                    await websocket.close(code=1011, reason="stand-in connection drop")
+                    return
+                if roll < self.drop_rate + self.error_rate:
+                    self.errors += 1
+                    await websocket.send(json.dumps({'error': "Simulated stand-in error", 'code': 'E0300'}))
+                    continue
+                await websocket.send(json.dumps(self.response(payload)))
+        except websockets.exceptions.ConnectionClosed:
+            pass # The client went away
+
+    def response(self, payload):
+        """A response with predictions for each model in the request's `models`."""
+        response = {}
+        models = payload.get('models') or {'prosody': {}}
+        if 'prosody' in models:
+            emotions = [{'name': name, 'score': score}
+                        for name, score in zip(self.scorer.names, self.scorer.scores_for(payload['data'].encode()))]
+            response['prosody'] = {'predictions': [{'time': None, 'emotions': emotions}]}
+        if 'burst' in models:
+            response['burst'] = {'predictions': []}
+        return response
+
+    def stats(self):
+        return {'connections': self.connections, 'requests': self.requests, 'errors': self.errors, 'drops': self.drops}
+
+
+async def serve_forever(server):
+    async with server:
+        print(f"Hume stand-in listening on {server.url}")
+        try:
+            while True:
+                await asyncio.sleep(10)
+                print(f"[stand-in] {server.stats()}")
+        finally:
+            print(f"[stand-in] {server.stats()}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for Hume's streaming API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.3, help="Mean seconds before each answer")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Standard deviation of the latency (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="Fraction of requests that close the connection")
+    parser.add_argument('--seed', type=int, help="Seed for a reproducible latency/error/drop sequence")
+    args = parser.parse_args()
+    stand_in = HumeStandInServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                                 error_rate=args.error_rate, drop_rate=args.drop_rate, seed=args.seed)
+    asyncio.run(serve_forever(stand_in))
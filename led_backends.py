@@ -0,0 +1,52 @@
+from led_controller import LEDController
+
+
+class HeadlessLED:
+    """Stands in for gpiozero's RGBLED when no LED is attached. Remembers the last color,
+    set either as a whole (`color`) or per channel (`red`, `green`, `blue`), all 0-1."""
+
+    def __init__(self):
+        self.red = 0.0
+        self.green = 0.0
+        self.blue = 0.0
+
+    @property
+    def color(self):
+        return (self.red, self.green, self.blue)
+
+    @color.setter
+    def color(self, value):
+        self.red, self.green, self.blue = value
+
+    def off(self):
+        self.color = (0.0, 0.0, 0.0)
+
+
+def create_virtual_controller(config):
+    return LEDController(is_virtual=True, visualizer_process=config.visualizer_process)
+
+
+def create_gpio_controller(config):
+    from gpiozero import RGBLED # Only installed/usable on the Raspberry Pi
+    led = RGBLED(*config.led_pins, active_high=config.led_active_high)
+    return LEDController(led, is_virtual=False)
+
+
+def create_headless_controller(config):
+    return LEDController(HeadlessLED(), is_virtual=False)
+
+
+# Backend name (MilaConfig.backend) -> factory taking the config and returning an LEDController
+LED_BACKENDS = {
+    'virtual': create_virtual_controller,
+    'gpio': create_gpio_controller,
+    'headless': create_headless_controller,
+}
+
+
+def create_led_controller(config):
+    try:
+        factory = LED_BACKENDS[config.backend]
+    except KeyError:
+        raise ValueError(f"Unknown LED backend '{config.backend}'. Choose from: {', '.join(LED_BACKENDS)}")
+    return factory(config)
@@ -1,28 +1,142 @@
 import asyncio
-import tkinter as tk
 import numpy as np
 import time
 
+from tk_visualizer import TkVisualizer
+
+MIN_PULSE_INTENSITY = 0.7 # Pulse between 70% and 100% intensity rather than dimming to black
+
+
+class FrameStats:
+    """Keeps the last `capacity` frame intervals and render times for the animation loop."""
+
+    def __init__(self, capacity=300):
+        self.capacity = capacity
+        self.intervals = np.zeros(capacity)     # Time between consecutive frame starts
+        self.render_times = np.zeros(capacity)  # Time spent computing and outputting a frame
+        self.count = 0
+        self.late_frames = 0                    # Frames that started over half a frame after their deadline
+        self.dropped_frames = 0                 # Deadlines skipped entirely because a frame overran
+
+    def record(self, interval, render_time):
+        index = self.count % self.capacity
+        self.intervals[index] = interval
+        self.render_times[index] = render_time
+        self.count += 1
+
+    def summary(self):
+        """Frame interval and render time percentiles (ms) over the recent frames, plus counters."""
+        n = min(self.count, self.capacity)
+        summary = {'frames': self.count, 'late_frames': self.late_frames, 'dropped_frames': self.dropped_frames}
+        if n == 0:
+            return summary
+        for name, values in (('interval', self.intervals[:n]), ('render', self.render_times[:n])):
+            p50, p95, p99 = (np.percentile(values, [50, 95, 99]) * 1000.0).tolist()
+            summary[f'{name}_ms'] = {'p50': p50, 'p95': p95, 'p99': p99, 'max': float(values.max()) * 1000.0}
+        return summary
+
+
+async def run_frames(render_frame, frame_delay, frame_stats):
+    """Call `render_frame(now)` every `frame_delay` seconds, forever.
+
+    Frames are scheduled on an absolute timeline: frame n is due at start + n * frame_delay,
+    so sleep inaccuracy and slow frames don't accumulate into drift.
+    """
+    next_frame_time = time.monotonic()
+    last_frame_start = None
+
+    while True:
+        loop_start_time = time.monotonic()
+        if last_frame_start is not None:
+            lateness = loop_start_time - next_frame_time
+            if lateness > frame_delay / 2:
+                frame_stats.late_frames += 1
+        last_frame_interval = loop_start_time - last_frame_start if last_frame_start is not None else frame_delay
+        last_frame_start = loop_start_time
+
+        render_frame(loop_start_time)
+
+        frame_end_time = time.monotonic()
+        frame_stats.record(last_frame_interval, frame_end_time - loop_start_time)
+
+        next_frame_time += frame_delay
+        if frame_end_time > next_frame_time:
+            # Overran one or more deadlines: skip them rather than rendering a burst to catch up
+            missed = int((frame_end_time - next_frame_time) / frame_delay) + 1
+            frame_stats.dropped_frames += missed
+            next_frame_time += missed * frame_delay
+
+        await asyncio.sleep(next_frame_time - frame_end_time)
+
+
+class LEDAnimationClock:
+    """One animation loop for many LEDControllers (e.g. the panels of a dashboard): each frame
+    renders every controller in turn, instead of each controller running its own asyncio task.
+    Pass it to LEDController as `clock`; the controllers then share its frame rate and stats.
+    """
+
+    def __init__(self, frame_rate=30.0):
+        self.frame_rate = float(frame_rate)
+        self.frame_delay = 1.0 / self.frame_rate
+        self.frame_stats = FrameStats()
+        self.controllers = []
+        self.update_task = None
+
+    def add(self, controller):
+        self.controllers.append(controller)
+
+    def start_update_task(self):
+        if self.update_task is None or self.update_task.done():
+            self.update_task = asyncio.create_task(run_frames(self.render_frame, self.frame_delay, self.frame_stats))
+
+    def render_frame(self, now):
+        for controller in self.controllers:
+            controller.render_frame(now)
+
+
 class LEDController:
-    def __init__(self, led=None, is_virtual=False, pulse_frequency=2):
+    def __init__(self, led=None, is_virtual=False, pulse_frequency=2, pwm_levels=256, visualizer_process=False, visualizer=None,
+                 log=print, clock=None):
         self.led = led
         self.is_virtual = is_virtual
+        self.log = log                                    # Goal/blink change messages (MilaRunner points this at its tracer)
         
         # Attributes for color state and transitions
-        self.current_unmodulated_color = [0.0, 0.0, 0.0]  # Base color for pulsing, uses floats
-        self.active_goal_color = None                     # Target color for current transition
-        self.transition_start_color = [0.0, 0.0, 0.0]     # Color at the beginning of a transition
+        # Colors are preallocated float arrays that are updated in place every frame
+        self.current_unmodulated_color = np.zeros(3)      # Base color for pulsing
+        self.active_goal_color = None                     # Target color for current transition (list of floats)
+        self.transition_start_color = np.zeros(3)         # Color at the beginning of a transition
         self.transition_step = 0                          # Current step in an ongoing transition
         self.total_transition_steps = 15                  # Target steps for a full transition (~0.5s at 30fps)
+        self._transition_delta = np.zeros(3)              # Goal minus start color of the current transition
+        self._modulated_color = np.zeros(3)               # Output color after pulsing, 0-255
+        self._output_levels = np.zeros(3)                 # Output color quantized to PWM levels
+
+        # Output stage: only channels whose quantized level changed are written
+        self.pwm_levels = pwm_levels                      # Distinct duty cycles per channel we bother to write
+        self._last_written_levels = [-1, -1, -1]          # -1 forces the first write
+        self._last_virtual_fill = None
+        self._last_label_text = None
+        self.writes_issued = 0                            # Channel/canvas writes performed
+        self.writes_skipped = 0                           # Writes avoided because the value was unchanged
         
         self.current_emotion_name = "Initializing..."     # Name of the dominant emotion
 
-        self.phase = 0.0                                  # Current phase for the pulsing effect (0 to 1)
+        self.phase = 0.0                                  # Current phase for the pulsing effect (0 to 1), from wall time
+        self.pulse_start_time = time.monotonic()          # Phase origin
         self.pulse_frequency = float(pulse_frequency)
-        self.frame_delay = 1.0 / 30.0                     # Target frame delay for ~30 FPS
+        self.clock = clock                                # Shared LEDAnimationClock, or None to run our own loop
+        self.frame_rate = clock.frame_rate if clock is not None else 30.0
+        self.frame_delay = 1.0 / self.frame_rate          # Target frame delay for ~30 FPS
+
+        # Lookup tables so a frame needs no trigonometry or ramp arithmetic
+        self.pulse_table = self.build_pulse_table(self.pulse_frequency, self.frame_rate)
+        self.transition_ramp = np.linspace(0.0, 1.0, self.total_transition_steps + 1) # Progress for each step
+        self.frame_stats = clock.frame_stats if clock is not None else FrameStats()
 
         self.update_task = None
-        self.emotion_bars_canvas_items = [] # To keep track of drawn bar items
+        if clock is not None:
+            clock.add(self)
 
         # Blinking state
         self.is_blinking = False
@@ -35,123 +149,114 @@ class LEDController:
         self.current_blink_is_one = True # True if currently targeting blink_color_one
 
         if self.is_virtual:
-            self.root = tk.Tk()
-            self.root.title("Emotion Visualizer")
-            
-            # Main LED canvas
-            self.led_canvas_height = 200
-            self.led_canvas = tk.Canvas(self.root, width=200, height=self.led_canvas_height)
-            self.led_canvas.pack()
-            self.virtual_led = self.led_canvas.create_oval(50, 50, 150, 150, fill=self.rgb_to_hex(self.current_unmodulated_color))
-            self.emotion_label = tk.Label(self.root, text=self.current_emotion_name, font=("Helvetica", 14))
-            self.emotion_label.pack(pady=5)
-
-            # Emotion bars canvas
-            self.bars_canvas_height = 330 # Increased height for better padding
-            self.bars_canvas_width = 350 
-            self.bars_canvas = tk.Canvas(self.root, width=self.bars_canvas_width, height=self.bars_canvas_height, bg="lightgray")
-            self.bars_canvas.pack(pady=10)
-            
-            # Adjusted window geometry
-            new_total_height = self.led_canvas_height + self.bars_canvas_height + self.emotion_label.winfo_reqheight() + 40 # Added padding
-            self.root.geometry(f"{self.bars_canvas_width}x{new_total_height}")
+            # The window runs its own Tk loop in a separate thread/process; we only post state to it.
+            # A shared visualizer (anything with set_led/set_emotion_bars, e.g. a dashboard panel) can be passed in.
+            if visualizer is None:
+                visualizer = TkVisualizer(frame_rate=self.frame_rate, use_process=visualizer_process)
+            self.visualizer = visualizer
 
     def start_update_task(self):
+        if self.clock is not None:
+            self.clock.start_update_task() # Frames come from the shared clock
+            return
         if self.update_task is None or self.update_task.done():
             self.update_task = asyncio.create_task(self.update_led_loop())
 
     async def update_led_loop(self):
         """Main animation loop for the LED and UI updates."""
-        pulse_period = 1.0 / self.pulse_frequency if self.pulse_frequency > 0 else float('inf')
+        await run_frames(self.render_frame, self.frame_delay, self.frame_stats)
 
-        while True:
-            loop_start_time = time.monotonic()
+    def render_frame(self, now):
+        """Advance blinking, the color transition and the pulse to time `now` and write the
+        frame to the virtual or physical LED."""
+        # --- Blinking Logic ---
+        if self.is_blinking:
+            if (now - self.last_blink_switch_time) >= self.blink_interval:
+                self.current_blink_is_one = not self.current_blink_is_one
+                if self.current_blink_is_one:
+                    self._start_transition(self.blink_color_one)
+                    self.current_emotion_name = self.blink_emotion_name_one
+                else:
+                    self._start_transition(self.blink_color_two)
+                    self.current_emotion_name = self.blink_emotion_name_two
+                self.last_blink_switch_time = now
+
+        # --- Color Transition Logic ---
+        # start + (goal - start) * progress, written in place; once the last step is
+        # reached the color equals the goal and stays untouched
+        if self.active_goal_color is not None and self.transition_step < self.total_transition_steps:
+            self.transition_step += 1
+            color = self.current_unmodulated_color
+            np.multiply(self._transition_delta, self.transition_ramp[self.transition_step], out=color)
+            np.add(color, self.transition_start_color, out=color)
+            np.clip(color, 0.0, 255.0, out=color)
+        # If no active_goal_color, current_unmodulated_color just stays as is (e.g. initial black)
+
+        # --- Pulsing Logic ---
+        # Phase comes from elapsed time, so the pulse keeps its speed even when frames are late
+        self.phase = ((now - self.pulse_start_time) * self.pulse_frequency) % 1.0
+
+        pulse_table_size = len(self.pulse_table)
+        pulse_intensity = self.pulse_table[int(self.phase * pulse_table_size) % pulse_table_size]
+
+        modulated_color = self._modulated_color
+        np.multiply(self.current_unmodulated_color, pulse_intensity, out=modulated_color)
+        np.floor(modulated_color, out=modulated_color) # Whole 0-255 levels
+
+        # --- UI Update ---
+        if self.is_virtual:
+            fill = self.rgb_to_hex(modulated_color)
 
-            # --- Blinking Logic ---
+            label_text = self.current_emotion_name
             if self.is_blinking:
-                if (loop_start_time - self.last_blink_switch_time) >= self.blink_interval:
-                    self.current_blink_is_one = not self.current_blink_is_one
-                    if self.current_blink_is_one:
-                        self.active_goal_color = list(map(float, self.blink_color_one))
-                        self.current_emotion_name = self.blink_emotion_name_one
-                    else:
-                        self.active_goal_color = list(map(float, self.blink_color_two))
-                        self.current_emotion_name = self.blink_emotion_name_two
-                    
-                    self.transition_start_color = list(self.current_unmodulated_color)
-                    self.transition_step = 0
-                    self.last_blink_switch_time = loop_start_time
-            
-            # --- Color Transition Logic ---
-            if self.active_goal_color is not None:
-                if self.transition_step < self.total_transition_steps:
-                    self.transition_step += 1
-                    interpolated_color = self.interpolate_color(
-                        self.transition_start_color,
-                        self.active_goal_color,
-                        self.transition_step,
-                        self.total_transition_steps
-                    )
-                    self.current_unmodulated_color = [max(0.0, min(255.0, c)) for c in interpolated_color]
-                else: # Transition complete
-                    self.current_unmodulated_color = list(self.active_goal_color)
-            # If no active_goal_color, current_unmodulated_color just stays as is (e.g. initial black)
-
-            # --- Pulsing Logic ---
-            if pulse_period != float('inf'):
-                self.phase = (self.phase + self.frame_delay / pulse_period) % 1.0
-            else: # No pulsing if frequency is zero
-                self.phase = 0.0 
-            
-            # Sin wave from 0 to 1, then scaled to desired intensity range (e.g., 0.5 to 1.0 for pulsing, not dimming to black)
-            # Let's make it pulse between 70% and 100% intensity
-            min_pulse_intensity = 0.7 
-            pulse_amplitude = (1.0 - min_pulse_intensity) / 2.0
-            pulse_intensity = min_pulse_intensity + pulse_amplitude * (1 + np.sin(2 * np.pi * self.phase))
-
-
-            modulated_color = [max(0, min(255, int(c * pulse_intensity))) for c in self.current_unmodulated_color]
-
-            # --- UI Update ---
-            if self.is_virtual:
-                self.led_canvas.itemconfig(self.virtual_led, fill=self.rgb_to_hex(modulated_color))
-                
-                label_text = self.current_emotion_name
-                if self.is_blinking:
-                    if self.current_blink_is_one:
-                        other_emotion_name = self.blink_emotion_name_two
-                    else:
-                        other_emotion_name = self.blink_emotion_name_one
-                    label_text = f"Blinking: {self.current_emotion_name} & {other_emotion_name}"
-                    if self.transition_step < self.total_transition_steps:
-                         label_text += f" ({(self.transition_step/self.total_transition_steps)*100:.0f}%)"
-
-                elif self.active_goal_color is not None:
-                    if self.transition_step < self.total_transition_steps:
-                        label_text = f"{self.current_emotion_name} ({(self.transition_step/self.total_transition_steps)*100:.0f}%)"
+                if self.current_blink_is_one:
+                    other_emotion_name = self.blink_emotion_name_two
                 else:
-                     label_text = "Idle"
-                self.emotion_label.config(text=label_text)
-                
-                # It's crucial to update Tkinter's event loop
-                self.root.update_idletasks() # Process pending operations like layout changes
-                self.root.update()          # Process all other events and redraw
-
-            # --- Physical LED Update ---
-            if not self.is_virtual and self.led is not None:
-                # Convert 0-255 to 0-1 for gpiozero
-                scaled_color = tuple(max(0, min(1, c / 255.0)) for c in modulated_color)
-                self.led.color = scaled_color
-
-            # --- Frame Delay Management ---
-            elapsed_loop_time = time.monotonic() - loop_start_time
-            sleep_duration = self.frame_delay - elapsed_loop_time
-            
-            if sleep_duration > 0:
-                await asyncio.sleep(sleep_duration)
+                    other_emotion_name = self.blink_emotion_name_one
+                label_text = f"Blinking: {self.current_emotion_name} & {other_emotion_name}"
+                if self.transition_step < self.total_transition_steps:
+                     label_text += f" ({(self.transition_step/self.total_transition_steps)*100:.0f}%)"
+
+            elif self.active_goal_color is not None:
+                if self.transition_step < self.total_transition_steps:
+                    label_text = f"{self.current_emotion_name} ({(self.transition_step/self.total_transition_steps)*100:.0f}%)"
             else:
-                # If the loop took too long, yield control briefly to prevent freezing
-                await asyncio.sleep(0) 
+                 label_text = "Idle"
+
+            # Hand the frame to the render thread only when something visible changed
+            if fill != self._last_virtual_fill or label_text != self._last_label_text:
+                self.visualizer.set_led(fill, label_text)
+                self._last_virtual_fill = fill
+                self._last_label_text = label_text
+                self.writes_issued += 1
+            else:
+                self.writes_skipped += 1
+
+        # --- Physical LED Update ---
+        if not self.is_virtual and self.led is not None:
+            self._write_led_channels(modulated_color)
+
+    def _write_led_channels(self, modulated_color):
+        """Quantize a 0-255 color to the PWM resolution and write only the channels that changed."""
+        max_level = self.pwm_levels - 1
+        levels = self._output_levels
+        np.multiply(modulated_color, max_level / 255.0, out=levels)
+        np.rint(levels, out=levels)
+        for index, (channel, level) in enumerate(zip(('red', 'green', 'blue'), levels.tolist())):
+            if level == self._last_written_levels[index]:
+                self.writes_skipped += 1
+                continue
+            setattr(self.led, channel, level / max_level) # gpiozero takes 0-1 per channel
+            self._last_written_levels[index] = level
+            self.writes_issued += 1
+
+    def get_output_stats(self):
+        """How many LED channel (or virtual canvas) writes were issued and skipped as unchanged."""
+        return {'writes_issued': self.writes_issued, 'writes_skipped': self.writes_skipped}
+
+    def get_frame_stats(self):
+        """Frame timing summary: interval/render percentiles in ms and late/dropped frame counts."""
+        return self.frame_stats.summary()
 
     def set_goal_color(self, color, emotion_name=""):
         # Ensure color is a list of floats
@@ -166,16 +271,14 @@ class LEDController:
         if self.active_goal_color == target_color_float and self.current_emotion_name == emotion_name:
             # If we are already at the goal and name is same, ensure transition is marked complete
             if self.transition_step >= self.total_transition_steps:
-                 self.current_unmodulated_color = list(target_color_float) # Snap to final color
+                 self.current_unmodulated_color[:] = target_color_float # Snap to final color
             # print(f"Goal {emotion_name} {target_color_float} is already active or settled.")
             return
 
-        print(f"New Goal: {emotion_name} ({target_color_float}). From: {self.current_unmodulated_color}")
+        self.log(f"New Goal: {emotion_name} ({target_color_float}). From: {self.current_unmodulated_color.tolist()}")
         
-        self.transition_start_color = list(self.current_unmodulated_color) # Start from current state
-        self.active_goal_color = target_color_float
+        self._start_transition(target_color_float) # Start from current state
         self.current_emotion_name = emotion_name
-        self.transition_step = 0 # Reset transition
         
         self.start_update_task() # Ensure the animation loop is running
 
@@ -185,7 +288,7 @@ class LEDController:
            self.blink_color_two != list(map(float, color_two)) or \
            self.blink_interval != interval:
             
-            print(f"Setting blinking between {emotion_name_one} {color_one} and {emotion_name_two} {color_two}")
+            self.log(f"Setting blinking between {emotion_name_one} {color_one} and {emotion_name_two} {color_two}")
             self.is_blinking = True
             self.blink_color_one = list(map(float, color_one))
             self.blink_color_two = list(map(float, color_two))
@@ -195,71 +298,44 @@ class LEDController:
             
             # Initialize the first blink target
             self.current_blink_is_one = True
-            self.active_goal_color = list(self.blink_color_one)
+            self._start_transition(self.blink_color_one)
             self.current_emotion_name = self.blink_emotion_name_one
-            self.transition_start_color = list(self.current_unmodulated_color)
-            self.transition_step = 0
             self.last_blink_switch_time = time.monotonic() # Start interval timer
 
             self.start_update_task() # Ensure the animation loop is running
         # else:
             # print("Blinking parameters are already set.")
 
+    def _start_transition(self, goal_color):
+        """Begin a transition from the current color to `goal_color`."""
+        self.active_goal_color = list(map(float, goal_color))
+        self.transition_start_color[:] = self.current_unmodulated_color
+        np.subtract(self.active_goal_color, self.transition_start_color, out=self._transition_delta)
+        self.transition_step = 0 # Reset transition
+
     def update_emotion_bars(self, emotion_data):
-        if not self.is_virtual or not hasattr(self, 'bars_canvas'):
+        if not self.is_virtual:
             return
 
-        for item_id in self.emotion_bars_canvas_items:
-            self.bars_canvas.delete(item_id)
-        self.emotion_bars_canvas_items.clear()
-
-        bar_max_width = self.bars_canvas_width - 40 
-        bar_height = 20
-        spacing_y = 55  # Increased vertical spacing
-        start_y = 20    
-        text_y_offset_from_bar = 8 # Increased gap between bar and text
-
-        for i, (name, score, color_tuple) in enumerate(emotion_data):
-            bar_width = score * bar_max_width
-            x0 = 20 
-            y0 = start_y + i * spacing_y
-            x1 = x0 + bar_width
-            y1 = y0 + bar_height
-
+        bars = []
+        for name, score, color_tuple in emotion_data:
             try:
                 bar_color_hex = self.rgb_to_hex(tuple(map(int, color_tuple)))
             except (ValueError, TypeError):
-                bar_color_hex = "#808080" 
-
-            rect_id = self.bars_canvas.create_rectangle(x0, y0, x1, y1, fill=bar_color_hex, outline="black")
-            # Place text below the bar with increased offset
-            text_id = self.bars_canvas.create_text(x0, y1 + text_y_offset_from_bar, anchor=tk.NW, text=f"{name}: {score:.3f}", font=("Helvetica", 10))
-            
-            self.emotion_bars_canvas_items.append(rect_id)
-            self.emotion_bars_canvas_items.append(text_id)
-        
-        # No self.root.update() here; the main loop handles it.
+                bar_color_hex = "#808080"
+            bars.append((name, float(score), bar_color_hex))
+        self.visualizer.set_emotion_bars(bars)
 
     @staticmethod
-    def interpolate_color(start_color, end_color, step, total_steps):
-        # Ensure inputs are float lists
-        sc = [float(c) for c in start_color]
-        ec = [float(c) for c in end_color]
-
-        if total_steps == 0:
-            return list(ec) # Return end_color immediately if no steps
-            
-        # Calculate normalized progress (0.0 to 1.0)
-        progress = 0.0
-        if total_steps > 0 : # Avoid division by zero if step is 0 and total_steps is 0
-             progress = float(step) / float(total_steps)
-        progress = max(0.0, min(1.0, progress)) # Clamp progress
-
-        # Linear interpolation: start + (end - start) * progress
-        interpolated = [
-            sc[i] + (ec[i] - sc[i]) * progress for i in range(len(sc))
-        ]
-        return interpolated # Returns list of floats, clamping done by caller
+    def build_pulse_table(pulse_frequency, frame_rate):
+        """Pulse intensity for each frame of one pulse period, indexed by phase (0 to 1)."""
+        if pulse_frequency <= 0:
+            return np.ones(1) # No pulsing
+        frames_per_period = max(1, int(round(frame_rate / pulse_frequency)))
+        phases = np.arange(frames_per_period) / frames_per_period
+        # Sin wave from 0 to 1, scaled to the MIN_PULSE_INTENSITY..1.0 range
+        pulse_amplitude = (1.0 - MIN_PULSE_INTENSITY) / 2.0
+        return MIN_PULSE_INTENSITY + pulse_amplitude * (1 + np.sin(2 * np.pi * phases))
 
     @staticmethod
     def rgb_to_hex(rgb):
@@ -0,0 +1,507 @@
+"""Mila runner: microphone -> Hume prosody -> LED color.
+
+Usage:
+    python mila.py --backend virtual
+    python mila.py --preset pi --pipeline-depth 2
+"""
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+import websockets.exceptions
+from dotenv import load_dotenv
+from hume import HumeStreamClient
+from hume.models.config import BurstConfig, ProsodyConfig
+
+from capture_bridge import CaptureBridge
+from color_blend import EmotionColorBlender
+from cycle_executor import CYCLE_EXECUTORS, create_cycle_executor
+from emotion_decision import EmotionDecisionEngine
+from emotion_resolver import EmotionIndexResolver
+from hume_connection import Backoff, HumeConnectionManager
+from hume_pipeline import HumePipeline
+from led_backends import LED_BACKENDS, create_led_controller
+from mila_config import MilaConfig
+from resampler import PolyphaseResampler
+from result_cache import ResultCache
+from ring_buffer import AudioRingBuffer
+from tracing import TRACE_LEVELS, create_tracer
+from vad import VoiceActivityGate
+from wav_encoder import WavEncoder, WindowedWavEncoder
+
+
+# Function to encode audio (base64 encoding)
+def encode_audio(filename_to_encode):
+    with open(filename_to_encode, 'rb') as audio_file:
+        return base64.b64encode(audio_file.read())
+
+
+def create_hume_client(hume_stream_client_key, config):
+    if config.hume_url:
+        return HumeStreamClient(hume_stream_client_key, _api_ws_base_uri=config.hume_url)
+    return HumeStreamClient(hume_stream_client_key)
+
+
+def create_decision_engine(config, relevant_emotions_config):
+    """The EmotionDecisionEngine for `config`'s thresholds, smoothing, dwell and multi-emotion mode."""
+    return EmotionDecisionEngine(
+        [name for name, _, _ in relevant_emotions_config],
+        [color for _, _, color in relevant_emotions_config],
+        config.emotion_threshold, exit_threshold=config.emotion_exit_threshold,
+        smoothing=config.emotion_smoothing, min_dwell=config.emotion_min_dwell,
+        max_shown=None if config.multi_emotion_mode == 'blend' else 2, step=config.step_duration
+    )
+
+
+def create_color_blender(config, relevant_emotions_config):
+    """An EmotionColorBlender in blend mode, None in blink mode."""
+    if config.multi_emotion_mode == 'blend':
+        return EmotionColorBlender([color for _, _, color in relevant_emotions_config], lut_size=config.blend_lut_size)
+    if config.multi_emotion_mode != 'blink':
+        raise ValueError(f"Unknown multi_emotion_mode '{config.multi_emotion_mode}'. Choose 'blink' or 'blend'.")
+    return None
+
+
+def next_blend(engine, blender, decision_changed, previous_lab, min_delta):
+    """After `engine.update()` in blend mode with emotions shown: the blend to show as (RGB, OKLab,
+    shown indices strongest first), or None if the LED should keep its color because the set of
+    emotions is unchanged and the mix moved less than `min_delta` since `previous_lab`."""
+    shown = sorted(engine.shown, key=lambda i: -engine.smoothed[i])
+    weights = np.zeros(len(engine.smoothed))
+    weights[shown] = engine.smoothed[shown]
+    color, lab = blender.blend(weights)
+    if not decision_changed and previous_lab is not None and np.linalg.norm(lab - previous_lab) < min_delta:
+        return None
+    return color, lab, shown
+
+
+def print_audio_devices(device):
+    import sounddevice as sd
+    print("Available audio devices:")
+    print(sd.query_devices())
+    print("-------------------------")
+    try:
+        device_info = sd.query_devices(device, 'input')
+        print(f"Capabilities of '{device_info['name']}' (device {device}):")
+        print(f"  Default sample rate: {device_info['default_samplerate']} Hz")
+        # Note: sd.query_devices doesn't always list all supported sample rates directly.
+        # For more detailed info, 'arecord --dump-hw-params -D hw:1,0' can be used in terminal.
+    except Exception as e:
+        print(f"Could not query device {device}: {e}")
+    print("-------------------------")
+
+
+class MilaRunner:
+    """Captures audio, sends sliding windows to Hume and drives an LEDController."""
+
+    def __init__(self, config, led_controller=None, tracer=None):
+        self.config = config
+        self.led_controller = led_controller if led_controller is not None else create_led_controller(config)
+        # Cycle messages and stage timings are queued here and written out by a background thread
+        self.tracer = tracer if tracer is not None else create_tracer(config)
+        # LED goal changes happen on the event loop too; keep their messages off stdout
+        self.led_controller.log = self.tracer.log
+
+        # Holds one window plus one step of slack so the callback never overwrites samples being read
+        self.audio_buffer = AudioRingBuffer(config.window_samples + config.step_samples)
+        # Converts microphone audio to config.samplerate before it is buffered (no-op when the rates match)
+        self.resampler = PolyphaseResampler(config.input_samplerate, config.samplerate)
+
+        dump_path = config.chunk_filename if config.debug_dump_chunks else None
+        self.wav_encoder = WavEncoder(config.samplerate, dump_path=dump_path)
+        self.windowed_encoder = WindowedWavEncoder(config.samplerate, config.step_samples, config.steps_per_window,
+                                                   dump_path=dump_path)
+        # Wakes the analysis loop from the capture callback each time a step of audio is complete,
+        # on the windowed encoder's step grid so windows end exactly where a step does
+        self.capture_bridge = CaptureBridge(self.audio_buffer, self.windowed_encoder.step_samples)
+        # Runs the encode stage inline, on a worker thread or in a worker process (see cycle_executor.py)
+        self.cycle_executor = create_cycle_executor(config)
+        # Voice activity gate, run on the newest step of audio. The hangover keeps it open while
+        # speech from earlier steps is still inside the analysis window.
+        self.voice_gate = VoiceActivityGate(config.samplerate, hangover_blocks=config.steps_per_window - 1)
+
+        self.relevant_emotions_config = [
+            (name, config.hume_indices[name], color)
+            for name, color in config.emotion_colors.items()
+        ]
+        self.emotion_resolver = EmotionIndexResolver(
+            [name for name, _, _ in self.relevant_emotions_config],
+            [hume_index for _, hume_index, _ in self.relevant_emotions_config],
+            log=self.tracer.log
+        )
+        # Turns the scores of successive windows into LED decisions that only change when they should
+        self.decision_engine = create_decision_engine(config, self.relevant_emotions_config)
+        # Blend mode shows all active emotions as one mixed color instead of blinking between two
+        self.color_blender = create_color_blender(config, self.relevant_emotions_config)
+        self.blend_lab = None   # OKLab coordinates of the blend last sent to the LED
+
+        # Results of windows already scored, keyed by window content (replays, tests, demos)
+        self.result_cache = None
+        if config.result_cache_entries > 0:
+            self.result_cache = ResultCache(config.result_cache_entries, disk_path=config.result_cache_path,
+                                            max_disk_bytes=config.result_cache_max_bytes,
+                                            namespace="burst,prosody") # The model configs sent in run()
+
+    # Callback function for the audio stream
+    def stream_audio_callback(self, indata, frames, time_info, status):
+        """This is called (from a separate thread) for each audio block."""
+        if status:
+            print(status, file=sys.stderr)
+        self.audio_buffer.write(self.resampler.process(indata[:, 0]))
+        self.capture_bridge.notify()
+
+    def encode_current_window(self):
+        """Snapshot the latest window, run the optional silence check and encode it for Hume."""
+        encoded_audio, max_amp = self.encode_window()
+        self.warn_if_silent(max_amp)
+        return encoded_audio
+
+    def encode_window(self):
+        """Encode the latest window. Returns (base64 WAV, peak amplitude or None when the silence
+        check is off). Touches no event loop state, so an executor may run it on another thread."""
+        config = self.config
+        if config.audio_encoder == 'windowed' and config.silence_warning_amplitude is None:
+            return self.windowed_encoder.encode(self.audio_buffer), None
+
+        current_audio_window = self.audio_buffer.latest_window(config.window_samples)
+        max_amp = None
+        if config.silence_warning_amplitude is not None:
+            # More robust silence check: warn if max amplitude is very low
+            max_amp = float(np.max(np.abs(current_audio_window)))
+
+        if config.audio_encoder == 'windowed':
+            return self.windowed_encoder.encode(self.audio_buffer), max_amp
+        elif config.audio_encoder == 'memory':
+            return self.wav_encoder.encode(current_audio_window), max_amp
+        sf.write(config.chunk_filename, current_audio_window, config.samplerate)
+        return encode_audio(config.chunk_filename), max_amp
+
+    def warn_if_silent(self, max_amp):
+        if max_amp is not None and max_amp < self.config.silence_warning_amplitude:
+            self.tracer.log(f"[WARNING] The recorded audio chunk is essentially silent (max amplitude: {max_amp:.5f}). Check your microphone and audio input settings.")
+
+    def window_has_voice(self, current_cycle_log_time_ref):
+        """Returns False (and drives the LED to neutral) when the window has no voice activity."""
+        if not self.config.vad_enabled:
+            return True
+        was_active = self.voice_gate.is_active
+        if self.voice_gate.process(self.audio_buffer.latest_window(self.config.step_samples)):
+            return True
+        self.show_silence()
+        if was_active:
+            self.tracer.log("No voice activity. Skipping Hume calls until speech resumes.", current_cycle_log_time_ref)
+        return False
+
+    def show_silence(self):
+        """Drive the LED to neutral for a window without voice and start the next decision afresh."""
+        self.decision_engine.reset()
+        self.led_controller.set_goal_color(self.config.neutral_color, emotion_name="Neutral (Silence)")
+
+    def apply_hume_result(self, result, current_cycle_log_time_ref):
+        """Turn a Hume response into LED state and emotion bars."""
+        led_controller = self.led_controller
+        neutral_color = self.config.neutral_color
+        emotion_threshold = self.config.emotion_threshold
+
+        if 'prosody' not in result or 'predictions' not in result['prosody'] or not result['prosody']['predictions']:
+            self.tracer.log("No prosody predictions.", current_cycle_log_time_ref)
+            self.decision_engine.reset()
+            led_controller.set_goal_color(neutral_color, emotion_name="Neutral (No Prediction)")
+            return
+
+        with self.tracer.span('parse'):
+            emotions = result['prosody']['predictions'][0]['emotions']
+
+            scores = self.emotion_resolver.scores(emotions)
+            # Smoothing, enter/exit thresholds and dwell time; None while the LED should stay as it is
+            strong_emotions = self.decision_engine.update(scores, time.monotonic())
+            emotion_bar_data = [
+                (name, score, color_rgb)
+                for (name, _, color_rgb), score in zip(self.relevant_emotions_config, self.decision_engine.smoothed.tolist())
+            ]
+
+        with self.tracer.span('led'):
+            led_controller.update_emotion_bars(emotion_bar_data)
+            if self.color_blender is not None:
+                self.show_blend(strong_emotions, current_cycle_log_time_ref)
+                return
+            if strong_emotions is None:
+                return
+            if not strong_emotions:
+                led_controller.set_goal_color(neutral_color, emotion_name="Neutral")
+                self.tracer.log(f"No emotions above threshold {emotion_threshold}. Setting LED to neutral.", current_cycle_log_time_ref)
+            elif len(strong_emotions) == 1:
+                emotion = strong_emotions[0]
+                led_controller.set_goal_color(emotion['color'], emotion_name=emotion['name'])
+                self.tracer.log(f"Dominant Emotion for LED: {emotion['name']} ({emotion['score']:.3f})", current_cycle_log_time_ref)
+            else: # Two emotions active
+                emotion1 = strong_emotions[0]
+                emotion2 = strong_emotions[1]
+                led_controller.set_blinking_colors(
+                    emotion1['color'],
+                    emotion2['color'],
+                    emotion_name_one=emotion1['name'],
+                    emotion_name_two=emotion2['name']
+                )
+                self.tracer.log(f"Blinking between: {emotion1['name']} ({emotion1['score']:.3f}) and {emotion2['name']} ({emotion2['score']:.3f})", current_cycle_log_time_ref)
+
+    def show_blend(self, strong_emotions, current_cycle_log_time_ref):
+        """Blend mode: show the score-weighted OKLab mix of the active emotions as one goal color.
+        While the set of emotions stays the same, the LED is only updated once the mix has moved
+        by `blend_min_delta` (OKLab distance)."""
+        engine = self.decision_engine
+        if not engine.shown:
+            if strong_emotions is not None:
+                self.led_controller.set_goal_color(self.config.neutral_color, emotion_name="Neutral")
+                self.tracer.log(f"No emotions above threshold {self.config.emotion_threshold}. Setting LED to neutral.", current_cycle_log_time_ref)
+            return
+
+        blend = next_blend(engine, self.color_blender, strong_emotions is not None, self.blend_lab, self.config.blend_min_delta)
+        if blend is None:
+            return
+        color, self.blend_lab, shown = blend
+        name = " + ".join(engine.names[i] for i in shown)
+        self.led_controller.set_goal_color(color, emotion_name=name)
+        self.tracer.log(f"Blended color for LED: {name} ({', '.join(f'{engine.smoothed[i]:.3f}' for i in shown)})", current_cycle_log_time_ref)
+
+    def create_connection_manager(self, client, configs):
+        config = self.config
+        return HumeConnectionManager(client, configs, stream_window_ms=config.hume_stream_window_ms,
+                                     reset_stream=config.hume_reset_stream, standby=config.hume_standby,
+                                     keepalive_interval=config.hume_keepalive_interval,
+                                     backoff_initial=config.reconnect_backoff_initial,
+                                     backoff_max=config.reconnect_backoff_max, log=self.tracer.log)
+
+    async def run_sequential(self, client, configs):
+        """Send one window per step, waiting for each response. Connection losses are handled
+        by the connection manager; windows arriving while Hume is unreachable are skipped."""
+        async with self.create_connection_manager(client, configs) as connection:
+            print("Successfully connected to Hume API.")
+            await self.capture_bridge.wait_for_samples(self.config.window_samples)
+            step = None
+            while True:
+                # Each cycle starts as soon as the capture callback completes a step
+                step = await self.capture_bridge.next_step(step)
+                current_cycle_log_time_ref = self.tracer.begin_cycle()
+
+                with self.tracer.span('buffer'):
+                    has_voice = self.window_has_voice(current_cycle_log_time_ref)
+                if not has_voice:
+                    continue
+
+                with self.tracer.span('encode'):
+                    encoded_audio = await self.cycle_executor.encode(self)
+                self.tracer.log("Audio encoded. Sending to Hume...", current_cycle_log_time_ref)
+
+                hume_send_time = time.monotonic()
+                cache_key = None
+                result = None
+                if self.result_cache is not None:
+                    cache_key = self.result_cache.key(encoded_audio)
+                    result = self.result_cache.get(cache_key)
+                if result is not None:
+                    self.tracer.log(f"Result cache hit ({self.result_cache.hits} hits, {self.result_cache.misses} misses).", current_cycle_log_time_ref)
+                else:
+                    result = await connection.send(encoded_audio)
+                    if result is None:
+                        self.tracer.log(f"Hume unreachable, skipping window. Connection: {connection.stats()}", current_cycle_log_time_ref)
+                        continue
+                    hume_receive_time = time.monotonic()
+                    self.tracer.record_span('send', hume_send_time, hume_receive_time)
+                    self.tracer.log(f"Received response from Hume. API call took: {hume_receive_time - hume_send_time:.3f}s.", current_cycle_log_time_ref)
+                    if cache_key is not None:
+                        self.result_cache.put(cache_key, result)
+
+                self.apply_hume_result(result, current_cycle_log_time_ref)
+
+    async def run_pipelined(self, client, configs):
+        """Dispatch a window every step on a pool of sockets without waiting for earlier
+        responses, and apply results in order as they come back."""
+        config = self.config
+        dispatch_times = {} # Request sequence number -> (cycle start time, send time, cycle), for logs and spans
+
+        def on_result(result, seq):
+            receive_time = time.monotonic()
+            # Cache hits are applied inside dispatch(), before their time is recorded
+            current_cycle_log_time_ref, send_time, cycle = dispatch_times.pop(seq, (receive_time, receive_time, None))
+            for stale_seq in [s for s in dispatch_times if s < seq]:
+                del dispatch_times[stale_seq]
+            self.tracer.record_span('send', send_time, receive_time, cycle)
+            self.apply_hume_result(result, current_cycle_log_time_ref)
+
+        async with HumePipeline(client, configs, depth=config.pipeline_depth, on_result=on_result,
+                                cache=self.result_cache, stream_window_ms=config.hume_stream_window_ms,
+                                reset_stream=config.hume_reset_stream == 'always', log=self.tracer.log) as pipeline:
+            print(f"Successfully connected to Hume API with {config.pipeline_depth} pipelined sockets.")
+            await self.capture_bridge.wait_for_samples(config.window_samples)
+            step = None
+            while True:
+                # Dispatch on every step boundary; steps missed while busy are skipped, not queued
+                step = await self.capture_bridge.next_step(step)
+                current_cycle_log_time_ref = self.tracer.begin_cycle()
+
+                with self.tracer.span('buffer'):
+                    has_voice = self.window_has_voice(current_cycle_log_time_ref)
+                if not has_voice:
+                    continue
+
+                with self.tracer.span('encode'):
+                    encoded_audio = await self.cycle_executor.encode(self)
+                send_time = time.monotonic()
+                seq = pipeline.dispatch(encoded_audio)
+                if seq is not None:
+                    dispatch_times[seq] = (current_cycle_log_time_ref, send_time, self.tracer.cycle)
+                    self.tracer.log(f"Audio encoded. Dispatched request #{seq} to Hume.", current_cycle_log_time_ref)
+
+    def open_input_stream(self):
+        import sounddevice as sd # Imported here so runners without a microphone (dashboard, batch) don't need PortAudio
+        config = self.config
+        try:
+            return sd.InputStream(
+                device=config.device,
+                samplerate=config.input_samplerate,
+                channels=config.channels,
+                callback=self.stream_audio_callback,
+                blocksize=int(config.input_samplerate * 0.1)  # Smaller blocks for faster buffer fill
+            )
+        except sd.PortAudioError as e:
+            # Check for paInvalidSampleRate, which has an error code of -9997
+            if len(e.args) > 1 and e.args[1] == -9997:
+                print(f"Error: The configured capture sample rate ({config.input_samplerate} Hz) is not supported by the microphone.")
+                device_info_msg = "Could not query device info for suggestion."
+                try:
+                    dev_info = sd.query_devices(config.device, 'input')
+                    device_info_msg = f"Try changing capture_samplerate to the device's default sample rate ({dev_info['default_samplerate']} Hz) or another supported rate."
+                except Exception:
+                    pass # Keep the generic message
+                print(device_info_msg)
+            else:
+                print(f"PortAudioError opening stream: {e}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error setting up audio stream: {e}")
+            sys.exit(1)
+
+    async def run(self, hume_stream_client_key):
+        self.led_controller.start_update_task()
+        client = create_hume_client(hume_stream_client_key, self.config)
+        configs = [BurstConfig(), ProsodyConfig()]
+
+        stream = self.open_input_stream()
+        try:
+            stream.start()
+            print("Audio stream started.")
+            print(f"Buffering initial {self.config.window_duration} seconds of audio...")
+
+            await self.capture_bridge.wait_for_samples(self.config.window_samples)
+            print("Initial audio buffer filled. Starting analysis loop.")
+
+            # Last-resort restart for errors the connection manager doesn't absorb (and for
+            # pipelined mode, whose socket pool is rebuilt on any failure)
+            backoff = Backoff(self.config.reconnect_backoff_initial, self.config.reconnect_backoff_max)
+            while True:
+                session_start = time.monotonic()
+                try:
+                    if self.config.pipeline_depth > 1:
+                        await self.run_pipelined(client, configs)
+                    else:
+                        await self.run_sequential(client, configs)
+                except websockets.exceptions.ConnectionClosedError:
+                    print("Hume connection closed.")
+                except Exception as e:
+                    print(f"An error occurred in the main processing loop: {e}")
+                if time.monotonic() - session_start > self.config.reconnect_backoff_max:
+                    backoff.reset() # The last session was healthy for a while; start over from a short delay
+                delay = backoff.next_delay()
+                print(f"Reconnecting in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
+
+        finally:
+            print("Stopping audio stream...")
+            stream.stop()
+            stream.close()
+            print("Audio stream stopped.")
+            if hasattr(self.led_controller, 'stop_update_task'):
+                await self.led_controller.stop_update_task()
+            if self.result_cache is not None:
+                print(f"Result cache: {self.result_cache.stats()}")
+                self.result_cache.close()
+            self.cycle_executor.close()
+            self.tracer.close()
+
+
+def run(config):
+    """Entry point shared by mila.py and the record-*.py scripts."""
+    load_dotenv()
+    # Get the HumeStreamClient key from the environment variable
+    hume_stream_client_key = os.getenv("HUME_STREAM_CLIENT_KEY")
+    if not hume_stream_client_key and config.hume_url:
+        hume_stream_client_key = "local" # The stand-in server does not check keys
+    if not hume_stream_client_key:
+        print("Error: HUME_STREAM_CLIENT_KEY environment variable not set.")
+        print("Please set it in your .env file or environment.")
+        return
+
+    if config.device is not None:
+        print_audio_devices(config.device)
+    runner = MilaRunner(config)
+    asyncio.run(runner.run(hume_stream_client_key))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Give color to your voice: stream microphone audio to Hume and show the emotion on an LED.")
+    parser.add_argument('--preset', choices=['virtual', 'pi'], default='virtual',
+                        help="Starting configuration: 'virtual' (Tk window) or 'pi' (Pi Zero with GPIO LED)")
+    parser.add_argument('--backend', choices=list(LED_BACKENDS), help="LED backend")
+    parser.add_argument('--device', type=int, help="sounddevice input device index")
+    parser.add_argument('--samplerate', type=int, help="Rate audio is sent to Hume at (Hz)")
+    parser.add_argument('--capture-samplerate', type=int, help="Microphone rate (Hz), resampled to --samplerate")
+    parser.add_argument('--window', type=float, dest='window_duration', help="Analysis window (s)")
+    parser.add_argument('--step', type=float, dest='step_duration', help="Time between analyses (s)")
+    parser.add_argument('--threshold', type=float, dest='emotion_threshold', help="Minimum score for an emotion to show")
+    parser.add_argument('--exit-threshold', type=float, dest='emotion_exit_threshold',
+                        help="Score a shown emotion must drop below to turn off (default: 0.8 x --threshold)")
+    parser.add_argument('--smoothing', type=float, dest='emotion_smoothing',
+                        help="Weight of the newest window in the smoothed scores (1.0 disables smoothing)")
+    parser.add_argument('--min-dwell', type=float, dest='emotion_min_dwell', help="Seconds an LED decision is held at least")
+    parser.add_argument('--multi-emotion', choices=['blink', 'blend'], dest='multi_emotion_mode',
+                        help="With several emotions active: 'blink' between the top two or 'blend' all into one color")
+    parser.add_argument('--blend-lut', type=int, dest='blend_lut_size', metavar='STEPS',
+                        help="Precompute blend gradients between each pair of colors in this many steps (0: exact)")
+    parser.add_argument('--encoder', choices=['windowed', 'memory', 'file'], dest='audio_encoder')
+    parser.add_argument('--executor', choices=CYCLE_EXECUTORS, dest='cycle_executor',
+                        help="Where windows are encoded: 'inline' (event loop), 'thread' or 'process' (keeps the LED animation smooth)")
+    parser.add_argument('--pipeline-depth', type=int, help="Concurrent Hume sockets (>1 enables pipelining)")
+    parser.add_argument('--no-vad', action='store_false', dest='vad_enabled', default=None,
+                        help="Send every window to Hume, even silent ones")
+    parser.add_argument('--hume-url', help="Streaming API base URI, e.g. ws://127.0.0.1:8765 for hume_stand_in.py")
+    parser.add_argument('--reset-stream', choices=['auto', 'always'], dest='hume_reset_stream',
+                        help="When to reset Hume's stream: 'auto' (only after a rejected payload) or 'always' (every send)")
+    parser.add_argument('--no-standby', action='store_false', dest='hume_standby', default=None,
+                        help="Don't keep a second Hume connection open for failover")
+    parser.add_argument('--result-cache', type=int, dest='result_cache_entries', metavar='ENTRIES',
+                        help="Reuse Hume results for identical windows, keeping this many in memory")
+    parser.add_argument('--result-cache-path', help="sqlite file that keeps cached results across runs")
+    parser.add_argument('--trace-level', choices=TRACE_LEVELS,
+                        help="'off', 'info' (cycle messages) or 'spans' (also per-stage timings)")
+    parser.add_argument('--trace-path', help="Append trace events to this JSON lines file")
+    parser.add_argument('--metrics-port', type=int, help="Serve stage timings for Prometheus on http://localhost:PORT/metrics")
+    parser.add_argument('--debug-dump-chunks', action='store_true', default=None,
+                        help="Write each encoded chunk to disk")
+    return parser.parse_args(argv)
+
+
+def config_from_args(args):
+    overrides = {key: value for key, value in vars(args).items() if key != 'preset' and value is not None}
+    if args.preset == 'pi':
+        return MilaConfig.for_pi_zero(**overrides)
+    return MilaConfig.for_virtual(**overrides)
+
+
+if __name__ == '__main__':
+    run(config_from_args(parse_args()))
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional, Tuple
+
+Color = Tuple[int, int, int]
+
+# Colors corresponding to each emotion (in RGB format)
+DEFAULT_EMOTION_COLORS: Dict[str, Color] = {
+    'Anger': (255, 0, 0),
+    'Calmness': (0, 255, 0),
+    'Embarrassment': (255, 255, 0),
+    'Excitement': (255, 128, 0),
+    'Romance': (255, 0, 255),
+    'Sadness': (0, 0, 255),
+}
+
+# Position of each emotion in Hume's prosody emotion list, used when a name lookup fails
+DEFAULT_HUME_INDICES: Dict[str, int] = {
+    'Anger': 4,
+    'Calmness': 9,
+    'Embarrassment': 22,
+    'Excitement': 26,
+    'Romance': 38,
+    'Sadness': 39,
+}
+
+
+@dataclass
+class MilaConfig:
+    """Everything that differs between Mila deployments (Pi Zero, virtual LED, headless)."""
+
+    # Audio capture and analysis windows
+    samplerate: int = 16000                     # Hz, rate audio is buffered and sent to Hume at
+    capture_samplerate: Optional[int] = None    # Hz, microphone rate; None means same as samplerate
+    channels: int = 1
+    device: Optional[int] = None                # sounddevice input device index; None uses the default
+    window_duration: float = 3.0                # seconds of audio to analyze
+    step_duration: float = 1.0                  # seconds between analyses
+
+    # LED output
+    backend: str = 'virtual'                    # 'virtual' (Tk window), 'gpio' (RGBLED) or 'headless'
+    led_pins: Tuple[int, int, int] = (14, 15, 18)
+    led_active_high: bool = False
+    visualizer_process: bool = False            # Run the virtual LED window in a separate process instead of a thread
+
+    # Emotion to color mapping
+    emotion_threshold: float = 0.1              # Smoothed score at which an emotion is shown
+    emotion_exit_threshold: Optional[float] = None # Smoothed score a shown emotion must drop below to turn off; None: 0.8 x emotion_threshold
+    emotion_smoothing: float = 0.5              # Weight of the newest window in the smoothed scores; 1.0 disables smoothing
+    emotion_min_dwell: float = 1.0              # Seconds an LED decision is held before it may change
+    multi_emotion_mode: str = 'blink'           # Several emotions active: 'blink' between the top two or 'blend' them all
+    blend_lut_size: int = 0                     # Steps of the precomputed gradient per color pair; 0 blends exactly
+    blend_min_delta: float = 0.02               # OKLab distance a blend must drift before the LED is updated
+    emotion_colors: Dict[str, Color] = field(default_factory=lambda: dict(DEFAULT_EMOTION_COLORS))
+    hume_indices: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_HUME_INDICES))
+    neutral_color: Color = (255, 255, 255)
+
+    # Hume connection
+    hume_url: Optional[str] = None              # Streaming API base URI, e.g. ws://127.0.0.1:8765 for hume_stand_in.py; None uses Hume
+    hume_reset_stream: str = 'auto'             # 'auto': server window = analysis window, reset only after a rejected payload; 'always': before every send
+    hume_standby: bool = True                   # Keep a second connection open for instant failover
+    hume_keepalive_interval: float = 20.0       # Seconds of idleness before a connection is pinged; 0 disables
+    reconnect_backoff_initial: float = 0.25     # Seconds before the first reconnect attempt, doubling per failure
+    reconnect_backoff_max: float = 10.0
+
+    # Processing pipeline
+    audio_encoder: str = 'windowed'             # 'windowed', 'memory' or 'file'
+    chunk_filename: str = 'output_chunk.wav'    # Used by the 'file' encoder and debug dumps
+    debug_dump_chunks: bool = False             # Also write each chunk to chunk_filename
+    cycle_executor: str = 'inline'              # Where windows are encoded: 'inline', 'thread' or 'process'
+    pipeline_depth: int = 1                     # Concurrent Hume sockets; >1 enables pipelined mode
+    vad_enabled: bool = True                    # Skip Hume calls on windows without voice activity
+    silence_warning_amplitude: Optional[float] = None # Warn when a window's peak is below this
+    result_cache_entries: int = 0               # Hume results kept in memory by window content; 0 disables the cache
+    result_cache_path: Optional[str] = None     # sqlite file for a persistent cache tier (needs result_cache_entries > 0)
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Tracing (see tracing.py)
+    trace_level: str = 'info'                   # 'off', 'info' (cycle messages) or 'spans' (also stage timings)
+    trace_path: Optional[str] = None            # JSON lines file for trace events
+    metrics_port: Optional[int] = None          # Serve Prometheus-style stage metrics on this port
+
+    @property
+    def input_samplerate(self) -> int:
+        return self.capture_samplerate or self.samplerate
+
+    @property
+    def window_samples(self) -> int:
+        return int(round(self.samplerate * self.window_duration))
+
+    @property
+    def step_samples(self) -> int:
+        return int(round(self.samplerate * self.step_duration))
+
+    @property
+    def steps_per_window(self) -> int:
+        return max(1, int(round(self.window_duration / self.step_duration)))
+
+    @property
+    def hume_stream_window_ms(self) -> Optional[int]:
+        """Sliding window for the Hume connection; None keeps the server default (and needs a reset per send)."""
+        if self.hume_reset_stream == 'always':
+            return None
+        return int(round(self.window_duration * 1000))
+
+    @classmethod
+    def for_pi_zero(cls, **overrides) -> 'MilaConfig':
+        """Physical Mila: USB microphone on device 1 and an RGB LED on GPIO 14/15/18."""
+        config = cls(capture_samplerate=44100, device=1, backend='gpio',
+                     chunk_filename='output_chunk_pi.wav', silence_warning_amplitude=0.01)
+        return replace(config, **overrides)
+
+    @classmethod
+    def for_virtual(cls, **overrides) -> 'MilaConfig':
+        """Virtual Mila: default microphone and a Tk window instead of the LED."""
+        return replace(cls(backend='virtual'), **overrides)
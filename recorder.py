@@ -13,34 +13,175 @@ Non-blocking mode (start and stop recording):
 ...     recfile2.start_recording()
 ...     time.sleep(5.0)
 ...     recfile2.stop_recording()
+
+In both modes audio is copied into preallocated buffers and written to disk
+in large chunks by a writer thread, so a slow SD card never stalls capture.
+Compressed output (much less disk I/O for long recordings) goes through
+soundfile:
+>>> rec = Recorder(file_format='FLAC')
+>>> with rec.open('session.flac') as recfile:
+...     recfile.record(duration=60.0)
+
+Blocks that arrive while every buffer is still waiting for the disk are
+dropped and counted in `Recorder.overflows`; input overflows reported by
+PortAudio are counted in `Recorder.input_overflows`, in both modes.
 '''
-import pyaudio
+import queue
+import threading
 import wave
 
+import numpy as np
+import pyaudio
+
+# Sample rates libopus accepts; soundfile only reports a mismatch on the first write
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
 class Recorder(object):
-    '''A recorder class for recording audio to a WAV file.
+    '''A recorder class for recording audio to a WAV (or FLAC/OGG) file.
     Records in mono by default.
+
+    file_format: 'WAV' (wave module), or any soundfile format such as 'FLAC'
+    or 'OGG' (with subtype 'OPUS' or 'VORBIS').
+    buffer_duration: seconds of audio per disk write.
+    num_buffers: buffers in the pool; together they bound how long the disk
+    may stall before audio is dropped.
     '''
 
-    def __init__(self, channels=1, rate=44100, frames_per_buffer=1024):
+    def __init__(self, channels=1, rate=44100, frames_per_buffer=1024,
+                 file_format='WAV', subtype=None, buffer_duration=0.5, num_buffers=8):
+        check_file_format(file_format, subtype, rate)
         self.channels = channels
         self.rate = rate
         self.frames_per_buffer = frames_per_buffer
+        self.file_format = file_format
+        self.subtype = subtype
+        self.buffer_duration = buffer_duration
+        self.num_buffers = num_buffers
+        self._files = []
 
     def open(self, fname, mode='wb'):
-        return RecordingFile(fname, mode, self.channels, self.rate,
-                            self.frames_per_buffer)
+        recfile = RecordingFile(fname, mode, self.channels, self.rate,
+                                self.frames_per_buffer, self.file_format, self.subtype,
+                                self.buffer_duration, self.num_buffers)
+        self._files.append(recfile)
+        return recfile
+
+    @property
+    def overflows(self):
+        '''Audio blocks dropped because no buffer was free, over all files opened by this recorder.'''
+        return sum(recfile.writer.overflows for recfile in self._files)
+
+    @property
+    def input_overflows(self):
+        '''Input overflows reported by PortAudio, over all files opened by this recorder.'''
+        return sum(recfile.input_overflows for recfile in self._files)
+
+def check_file_format(file_format, subtype, rate):
+    '''Raise ValueError for a format/subtype/rate combination that could only
+    fail once recording has started.'''
+    if file_format.upper() == 'WAV':
+        return
+    import soundfile as sf  # Only needed for compressed formats
+    if not sf.check_format(file_format, subtype):
+        raise ValueError(f"soundfile cannot write format {file_format!r} with subtype {subtype!r}")
+    if (subtype or '').upper() == 'OPUS' and rate not in OPUS_SAMPLE_RATES:
+        raise ValueError(f"Opus only supports {', '.join(map(str, OPUS_SAMPLE_RATES))} Hz, not {rate} Hz")
+
+class BufferedWriter(object):
+    '''Collects int16 audio into a pool of preallocated buffers and writes
+    full buffers from a background thread.
+
+    `write()` only copies into the current buffer and never blocks: when the
+    buffer fills it is queued for the writer thread and a free one is taken
+    from the pool. If none is free the incoming block is dropped and counted
+    in `overflows`. Must be fed from a single thread.
+    '''
+
+    def __init__(self, write_bytes, buffer_bytes, num_buffers, block_align):
+        self._write_bytes = write_bytes
+        self._block_align = block_align
+        buffer_bytes -= buffer_bytes % block_align  # Whole frames per buffer
+        self._buffers = [bytearray(buffer_bytes) for _ in range(num_buffers)]
+        self._free = queue.Queue()
+        for index in range(1, num_buffers):
+            self._free.put(index)
+        self._full = queue.Queue()  # (buffer index, length), or None to stop
+        self._current = 0
+        self._fill = 0
+        self.overflows = 0
+        self.bytes_written = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        if self._current is None and not self._take_free_buffer():
+            self.overflows += 1
+            return
+        position = 0
+        while position < len(data):
+            buffer = self._buffers[self._current]
+            count = min(len(buffer) - self._fill, len(data) - position)
+            buffer[self._fill:self._fill + count] = data[position:position + count]
+            self._fill += count
+            position += count
+            if self._fill == len(buffer):
+                self._full.put((self._current, self._fill))
+                self._current = None
+                if position < len(data) and not self._take_free_buffer():
+                    self.overflows += 1  # Rest of this block is lost
+                    return
+
+    def _take_free_buffer(self):
+        try:
+            self._current = self._free.get_nowait()
+        except queue.Empty:
+            return False
+        self._fill = 0
+        return True
+
+    def _run(self):
+        while True:
+            item = self._full.get()
+            if item is None:
+                return
+            index, length = item
+            try:
+                self._write_bytes(memoryview(self._buffers[index])[:length])
+                self.bytes_written += length
+            except Exception as e:  # Keep draining so capture never blocks; report on close
+                if self.error is None:
+                    self.error = e
+            self._free.put(index)
+
+    def close(self):
+        '''Write what is buffered and stop the writer thread.'''
+        if self._current is not None and self._fill:
+            self._full.put((self._current, self._fill))
+        self._current = None
+        self._full.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
 
 class RecordingFile(object):
-    def __init__(self, fname, mode, channels, 
-                rate, frames_per_buffer):
+    def __init__(self, fname, mode, channels,
+                rate, frames_per_buffer, file_format='WAV', subtype=None,
+                buffer_duration=0.5, num_buffers=8):
         self.fname = fname
         self.mode = mode
         self.channels = channels
         self.rate = rate
         self.frames_per_buffer = frames_per_buffer
+        self.file_format = file_format.upper()
+        self.subtype = subtype
+        self.input_overflows = 0
         self._pa = pyaudio.PyAudio()
         self.wavefile = self._prepare_file(self.fname, self.mode)
+        self._block_align = self.channels * self._pa.get_sample_size(pyaudio.paInt16)
+        self.writer = BufferedWriter(self._write_bytes, int(self.rate * buffer_duration) * self._block_align,
+                                     num_buffers, self._block_align)
         self._stream = None
 
     def __enter__(self):
@@ -56,9 +197,17 @@ class RecordingFile(object):
                                         rate=self.rate,
                                         input=True,
                                         frames_per_buffer=self.frames_per_buffer)
+        silence = bytes(self.frames_per_buffer * self._block_align)
         for _ in range(int(self.rate / self.frames_per_buffer * duration)):
-            audio = self._stream.read(self.frames_per_buffer)
-            self.wavefile.writeframes(audio)
+            try:
+                audio = self._stream.read(self.frames_per_buffer)
+            except IOError as e:
+                if e.errno != pyaudio.paInputOverflowed:
+                    raise
+                # PyAudio discards the block on overflow; write silence to keep the timing
+                self.input_overflows += 1
+                audio = silence
+            self.writer.write(audio)
         return None
 
     def start_recording(self):
@@ -78,19 +227,35 @@ class RecordingFile(object):
 
     def get_callback(self):
         def callback(in_data, frame_count, time_info, status):
-            self.wavefile.writeframes(in_data)
+            if status & pyaudio.paInputOverflow:
+                self.input_overflows += 1
+            self.writer.write(in_data)  # Only copies; the disk write happens on the writer thread
             return in_data, pyaudio.paContinue
         return callback
 
 
     def close(self):
-        self._stream.close()
+        if self._stream is not None:
+            self._stream.close()
         self._pa.terminate()
-        self.wavefile.close()
+        try:
+            self.writer.close()
+        finally:
+            self.wavefile.close()
+
+    def _write_bytes(self, data):
+        if self.file_format == 'WAV':
+            self.wavefile.writeframes(data)
+        else:
+            self.wavefile.write(np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels))
 
     def _prepare_file(self, fname, mode='wb'):
+        if self.file_format != 'WAV':
+            import soundfile as sf  # Only needed for compressed formats
+            return sf.SoundFile(fname, 'w', samplerate=self.rate, channels=self.channels,
+                                format=self.file_format, subtype=self.subtype)
         wavefile = wave.open(fname, mode)
         wavefile.setnchannels(self.channels)
         wavefile.setsampwidth(self._pa.get_sample_size(pyaudio.paInt16))
         wavefile.setframerate(self.rate)
-        return wavefile
\ No newline at end of file
+        return wavefile
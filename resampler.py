@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler (e.g. 44.1 kHz microphone audio to 16 kHz for Hume).
+
+    Audio is conceptually upsampled by `up`, low-pass filtered and downsampled by `down`,
+    but only the filter phases that produce output samples are evaluated: each output is
+    one dot product of `taps_per_phase` input samples, computed for the whole block at
+    once with NumPy. Filter history and the output position carry over between calls, so
+    consecutive blocks (e.g. from the audio callback) resample as one continuous signal.
+    """
+
+    def __init__(self, input_rate, output_rate, half_width=10, beta=8.0):
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        divisor = math.gcd(self.input_rate, self.output_rate)
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+
+        # Kaiser-windowed sinc low-pass at the lower of the two Nyquist rates, designed at
+        # the upsampled rate and scaled by `up` to keep unity gain
+        ratio = max(self.up, self.down)
+        self.taps_per_phase = 2 * half_width * ratio // self.up + 1
+        num_taps = self.taps_per_phase * self.up
+        t = np.arange(num_taps) - (num_taps - 1) / 2.0
+        taps = np.sinc(t / ratio) * np.kaiser(num_taps, beta)
+        taps *= self.up / taps.sum()
+        # Phase p uses taps p, p + up, p + 2*up, ...
+        self._phases = taps.reshape(self.taps_per_phase, self.up).T.astype(np.float32)
+        self._offsets = np.arange(self.taps_per_phase)
+
+        self.reset()
+
+    @property
+    def is_passthrough(self):
+        return self.up == 1 and self.down == 1
+
+    def reset(self):
+        """Forget filter history, e.g. after a gap in the input."""
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._inputs_consumed = 0   # Input samples seen so far
+        self._next_output = 0       # Index of the next output sample
+
+    def output_length(self, num_inputs):
+        """Number of output samples the next `process()` call will return for `num_inputs` samples."""
+        total_inputs = self._inputs_consumed + num_inputs
+        # Output n is produced once input (n * down) // up has arrived
+        return max(0, -(-(total_inputs * self.up) // self.down) - self._next_output)
+
+    def process(self, samples):
+        """Resample the next block of mono samples. Returns a float32 array."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self.is_passthrough:
+            return samples
+
+        num_outputs = self.output_length(len(samples))
+        buffer = np.concatenate((self._history, samples))
+
+        outputs = np.arange(self._next_output, self._next_output + num_outputs) * self.down
+        input_index = outputs // self.up - self._inputs_consumed + len(self._history)
+        phase = outputs % self.up
+        windows = buffer[input_index[:, None] - self._offsets]
+        result = np.einsum('ij,ij->i', self._phases[phase], windows)
+
+        self._next_output += num_outputs
+        self._inputs_consumed += len(samples)
+        self._history = buffer[len(buffer) - len(self._history):]
+        return result
@@ -0,0 +1,122 @@
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+class ResultCache:
+    """Content-addressed cache of Hume results, so a window that was already scored (replays,
+    tests, demos) is answered locally without a round trip or API quota.
+
+    Keys are a 128-bit BLAKE2b digest of the encoded window; `namespace` (e.g. the model
+    configs) is folded in so results for different requests never collide. Results live in
+    an in-memory LRU of `max_entries`, and, with `disk_path`, in a sqlite file whose least
+    recently used rows are evicted once it holds more than `max_disk_bytes` of results.
+    Use from one thread (the event loop).
+    """
+
+    def __init__(self, max_entries=256, disk_path=None, max_disk_bytes=64 * 1024 * 1024, namespace=''):
+        self.max_entries = max(1, int(max_entries))
+        self.max_disk_bytes = max_disk_bytes
+        self._namespace = namespace.encode()
+        self._memory = collections.OrderedDict() # key -> result, least recently used first
+
+        self._db = None
+        self._disk_bytes = 0
+        if disk_path:
+            if os.path.dirname(disk_path):
+                os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            self._db = sqlite3.connect(disk_path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, value TEXT NOT NULL,"
+                             " size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+        self.hits = 0
+        self.disk_hits = 0 # Subset of hits that came from the disk tier
+        self.misses = 0
+
+    def key(self, encoded_audio):
+        digest = hashlib.blake2b(self._namespace, digest_size=16)
+        digest.update(encoded_audio)
+        return digest.digest()
+
+    def get(self, key):
+        """The cached result for `key`, or None. Counts a hit or a miss."""
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return result
+
+        if self._db is not None:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+                result = json.loads(row[0])
+                self._remember(key, result)
+                self.hits += 1
+                self.disk_hits += 1
+                return result
+
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """Store `result`; error responses are not cached."""
+        if 'error' in result:
+            return
+        self._remember(key, result)
+        if self._db is None:
+            return
+
+        value = json.dumps(result)
+        old_row = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+        if old_row is not None:
+            self._disk_bytes -= old_row[0]
+        self._db.execute("INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                         (key, value, len(value), time.time()))
+        self._disk_bytes += len(value)
+        self._evict_disk()
+        self._db.commit()
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._db.execute("SELECT key, size FROM results ORDER BY last_used LIMIT 64").fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'memory_entries': len(self._memory),
+            'disk_bytes': self._disk_bytes,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
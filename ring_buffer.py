@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-size mono sample buffer shared between the audio callback and the analysis loop.
+
+    The PortAudio callback is the only writer; the asyncio loop is the only reader.
+    Samples are copied into a preallocated NumPy array, and the write position is
+    published only after the copy, so no lock is needed. Give the buffer some slack
+    over the largest window you read (e.g. one step) so a block being written while
+    a window is copied cannot overwrite the samples being read.
+    """
+
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(self.capacity, dtype=self.dtype)
+        self.total_written = 0      # Samples written since creation (monotonic)
+
+    def __len__(self):
+        return min(self.total_written, self.capacity)
+
+    def write(self, samples):
+        """Append samples. Called from the audio thread, must not block."""
+        samples = np.asarray(samples).reshape(-1)
+        n = num_new = len(samples)
+        if n == 0:
+            return
+        start = self.total_written % self.capacity
+        if n > self.capacity: # Only the newest samples fit
+            start = (start + n - self.capacity) % self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._data[start:end] = samples
+        else: # Wrap around the end of the array
+            split = self.capacity - start
+            self._data[start:] = samples[:split]
+            self._data[:n - split] = samples[split:]
+        self.total_written += num_new # Publish only after the samples are in place
+
+    def read(self, start, stop, out=None):
+        """Copy samples `start`..`stop` (absolute positions, see `total_written`) into `out`."""
+        oldest = self.total_written - len(self)
+        if start < oldest or stop > self.total_written or start > stop:
+            raise ValueError(f"Samples {start}..{stop} are not buffered (have {oldest}..{self.total_written})")
+        num_samples = stop - start
+        if out is None:
+            out = np.empty(num_samples, dtype=self.dtype)
+
+        first = start % self.capacity
+        split = min(num_samples, self.capacity - first)
+        out[:split] = self._data[first:first + split]
+        if split < num_samples: # Range straddles the wrap point
+            out[split:] = self._data[:num_samples - split]
+        return out
+
+    def latest_window(self, num_samples=None, out=None):
+        """Return the newest `num_samples` samples as a contiguous array, oldest first.
+
+        The samples are copied once into `out` (allocated if not given), so the result
+        stays valid while the callback keeps writing.
+        """
+        if num_samples is None:
+            num_samples = len(self)
+        num_samples = int(num_samples)
+        if num_samples > len(self):
+            raise ValueError(f"Requested {num_samples} samples but only {len(self)} are buffered")
+        end = self.total_written
+        return self.read(end - num_samples, end, out=out)
@@ -0,0 +1,108 @@
+import asyncio
+import contextlib
+import hashlib
+
+import numpy as np
+
+from hume_connection import HumeConnectionManager
+
+
+class HumeScorer:
+    """Scores encoded windows on a bounded pool of Hume connections.
+
+    Unlike HumePipeline, every request's result is returned to its caller; at most `concurrency`
+    requests are in flight and further callers wait for a free connection. With a `ResultCache`,
+    windows that were already scored are answered from it without using a connection.
+    Each connection is a HumeConnectionManager: a socket that dies is thrown away and reopened
+    with backoff, and the window is retried on the new one (up to `attempts` times, waiting at
+    most `reconnect_timeout` seconds for each reconnect) instead of failing every later window.
+    """
+
+    def __init__(self, client, configs, concurrency=4, cache=None, attempts=3, reconnect_timeout=60.0):
+        self.client = client
+        self.configs = configs
+        self.concurrency = max(1, int(concurrency))
+        self.cache = cache
+        self.attempts = attempts
+        self.reconnect_timeout = reconnect_timeout
+        self._exit_stack = None
+        self._idle_connections = None
+
+    async def __aenter__(self):
+        self._exit_stack = contextlib.AsyncExitStack()
+        self._idle_connections = asyncio.Queue()
+        try:
+            for _ in range(self.concurrency):
+                # Reset before every send, as each window is scored on its own
+                connection = await self._exit_stack.enter_async_context(
+                    HumeConnectionManager(self.client, self.configs, reset_stream='always', standby=False))
+                self._idle_connections.put_nowait(connection)
+        except BaseException:
+            await self._exit_stack.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._exit_stack.aclose()
+
+    async def score(self, encoded_audio):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(encoded_audio)
+            result = self.cache.get(cache_key)
+            if result is not None:
+                return result
+
+        connection = await self._idle_connections.get()
+        try:
+            for _ in range(self.attempts):
+                await asyncio.wait_for(connection.wait_connected(), self.reconnect_timeout)
+                result = await connection.send(encoded_audio)
+                if result is not None:
+                    break
+            else:
+                raise ConnectionError(f"Hume connection lost {self.attempts} times while scoring this window")
+        finally:
+            self._idle_connections.put_nowait(connection)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+
+def synthetic_prosody_result(names, scores):
+    """Hume-shaped streaming response with one prosody prediction."""
+    emotions = [{'name': name, 'score': score} for name, score in zip(names, scores)]
+    return {'prosody': {'predictions': [{'emotions': emotions}]}}
+
+
+class StubScorer:
+    """Local stand-in for Hume: deterministic pseudo-random scores derived from the payload,
+    so identical windows always get identical results. Optional `latency` (s) per request."""
+
+    def __init__(self, names, latency=0.0, concurrency=4):
+        self.names = list(names)
+        self.latency = latency
+        self.concurrency = concurrency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    def scores_for(self, encoded_audio):
+        seed = int.from_bytes(hashlib.blake2b(encoded_audio, digest_size=8).digest(), 'little')
+        return np.random.default_rng(seed).beta(0.6, 6.0, len(self.names)).tolist()
+
+    async def score(self, encoded_audio):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return synthetic_prosody_result(self.names, self.scores_for(encoded_audio))
+
+
+def hume_emotion_names(hume_indices):
+    """A Hume-length emotion name list with the configured emotions at their indices."""
+    names = [f"Other {i}" for i in range(max(hume_indices.values()) + 1)]
+    for name, index in hume_indices.items():
+        names[index] = name
+    return names
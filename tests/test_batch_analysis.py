@@ -0,0 +1,42 @@
+import numpy as np
+
+from batch_analysis import BatchAnalyzer
+from mila_config import MilaConfig
+from scorers import StubScorer, hume_emotion_names, synthetic_prosody_result
+
+
+def make_analyzer(**overrides):
+    config = MilaConfig(backend='headless', **overrides)
+    return BatchAnalyzer(config, StubScorer(hume_emotion_names(config.hume_indices))), config
+
+
+def scored_row(analyzer, config, window, **scores):
+    names = hume_emotion_names(config.hume_indices)
+    values = np.full(len(names), 0.01)
+    for name, score in scores.items():
+        values[names.index(name)] = score
+    return analyzer.result_row('a.wav', window, window * 1.0, window + 3.0, synthetic_prosody_result(names, values))
+
+
+def test_led_state_follows_dwell_and_silence():
+    analyzer, config = make_analyzer(emotion_smoothing=1.0, emotion_min_dwell=2.0)
+    rows = [
+        scored_row(analyzer, config, 0),                       # Quiet: neutral
+        scored_row(analyzer, config, 1, Anger=0.5),            # Within the dwell time: still neutral
+        scored_row(analyzer, config, 2, Anger=0.5),            # Dwell over: Anger
+        analyzer.result_row('a.wav', 3, 3.0, 6.0, None),       # Silence: neutral at once
+        scored_row(analyzer, config, 4, Anger=0.5, Sadness=0.4),
+    ]
+    analyzer.apply_led_decisions(list(reversed(rows)))        # Scoring finishes out of order
+    assert [row['led_state'] for row in rows] == ['neutral', 'neutral', 'solid', 'neutral', 'blink']
+    assert rows[2]['led_emotions'] == 'Anger'
+    assert rows[3]['led_emotions'] == 'Neutral (Silence)'
+    assert rows[4]['led_emotions'] == 'Anger+Sadness'
+
+
+def test_blend_mode_gives_one_color():
+    analyzer, config = make_analyzer(multi_emotion_mode='blend', emotion_min_dwell=0.0)
+    rows = [scored_row(analyzer, config, 0, Anger=0.5, Calmness=0.5)]
+    analyzer.apply_led_decisions(rows)
+    assert rows[0]['led_state'] == 'blend'
+    assert rows[0]['led_colors'].count('#') == 1
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from capture_bridge import CaptureBridge
+from ring_buffer import AudioRingBuffer
+
+
+def capture(bridge, ring_buffer, block_size, blocks, stop):
+    block = np.zeros(block_size, dtype=np.float32)
+    for _ in range(blocks):
+        if stop.is_set():
+            return
+        ring_buffer.write(block)
+        bridge.notify()
+        time.sleep(0.002)
+
+
+def wait_and_report(step_samples, target, block_size=1000):
+    ring_buffer = AudioRingBuffer(4 * step_samples + block_size)
+    bridge = CaptureBridge(ring_buffer, step_samples)
+    stop = threading.Event()
+
+    async def wait():
+        bridge.loop = asyncio.get_running_loop()
+        thread = threading.Thread(target=capture, args=(bridge, ring_buffer, block_size, 80, stop))
+        thread.start()
+        try:
+            await asyncio.wait_for(bridge.wait_for_samples(target), 5)
+            return ring_buffer.total_written
+        finally:
+            stop.set()
+            thread.join()
+
+    return asyncio.run(wait())
+
+
+def test_wakes_for_target_not_on_a_step_boundary():
+    # With a 15999-sample step the boundaries are at 47997 and 63996
+    woke_at = wait_and_report(15999, 48500)
+    assert 48500 <= woke_at < 48500 + 5 * 1000
+
+
+def test_wakes_on_step_boundary():
+    woke_at = wait_and_report(16000, 32000)
+    assert 32000 <= woke_at < 32000 + 5 * 1000
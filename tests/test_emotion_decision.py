@@ -0,0 +1,61 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from emotion_decision import EmotionDecisionEngine
+from mila import MilaRunner
+from mila_config import MilaConfig
+from scorers import hume_emotion_names, synthetic_prosody_result
+
+NAMES = ['Anger', 'Calmness']
+COLORS = [(255, 0, 0), (0, 255, 0)]
+
+
+def test_first_neutral_decision_is_emitted():
+    engine = EmotionDecisionEngine(NAMES, COLORS, 0.1)
+    assert engine.update([0.01, 0.02], now=0.0) == []
+    assert engine.update([0.01, 0.02], now=0.5) is None
+
+
+def test_reset_emits_next_decision_even_if_neutral():
+    engine = EmotionDecisionEngine(NAMES, COLORS, 0.1)
+    engine.update([0.01, 0.02], now=0.0)
+    engine.reset()
+    assert engine.update([0.01, 0.02], now=0.1) == []
+
+
+def test_hysteresis_and_dwell():
+    engine = EmotionDecisionEngine(NAMES, COLORS, 0.1, exit_threshold=0.05, smoothing=1.0, min_dwell=1.0)
+    assert [e['name'] for e in engine.update([0.2, 0.0], now=0.0)] == ['Anger']
+    assert engine.update([0.07, 0.0], now=2.0) is None      # Above the exit threshold: stays on
+    assert engine.update([0.0, 0.0], now=2.5) == []
+    assert engine.update([0.2, 0.0], now=3.0) is None       # Held for min_dwell
+    assert [e['name'] for e in engine.update([0.2, 0.0], now=3.5)] == ['Anger']
+
+
+def test_dwell_tolerates_a_step_just_short_of_it():
+    # 16 kHz with 15999-sample steps: each window ends a sample short of a whole second
+    step = 15999 / 16000
+    engine = EmotionDecisionEngine(NAMES, COLORS, 0.1, smoothing=1.0, min_dwell=1.0, step=step)
+    assert engine.update([0.2, 0.0], now=step) is not None
+    assert engine.update([0.0, 0.0], now=2 * step) == []
+    assert engine.update([0.2, 0.0], now=2.4 * step) is None    # Well within the dwell
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'multi_emotion_mode': 'blend'},
+    {'emotion_smoothing': 1.0, 'emotion_exit_threshold': 0.1, 'emotion_min_dwell': 0.0},
+])
+def test_neutral_only_first_window_sets_neutral_color(overrides):
+    config = MilaConfig(backend='headless', trace_level='off', **overrides)
+    runner = MilaRunner(config)
+    names = hume_emotion_names(config.hume_indices)
+
+    async def apply_quiet_window():
+        runner.apply_hume_result(synthetic_prosody_result(names, np.full(len(names), 0.01)), 0.0)
+
+    asyncio.run(apply_quiet_window())
+    assert runner.led_controller.active_goal_color == list(map(float, config.neutral_color))
+    assert runner.led_controller.current_emotion_name == "Neutral"
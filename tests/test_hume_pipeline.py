@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+
+from hume import HumeClientException
+
+from hume_pipeline import HumePipeline
+
+
+class FakeSocket:
+    """Answers each payload after `delays[payload]` seconds; payloads in `reject` raise the
+    first `reject[payload]` times."""
+
+    def __init__(self, delays=None, reject=None):
+        self.delays = delays or {}
+        self.reject = dict(reject or {})
+        self.resets = 0
+
+    async def reset_stream(self):
+        self.resets += 1
+
+    async def send_bytes(self, payload):
+        await asyncio.sleep(self.delays.get(payload, 0.0))
+        if self.reject.get(payload, 0) > 0:
+            self.reject[payload] -= 1
+            raise HumeClientException("hume(E0300): rejected")
+        return {'payload': payload}
+
+
+class FakeClient:
+    def __init__(self, socket):
+        self.socket = socket
+
+    @contextlib.asynccontextmanager
+    async def connect(self, configs, **kwargs):
+        yield self.socket
+
+
+def run_pipeline(socket, payloads, depth=1, reset_stream=False):
+    applied = []
+
+    async def run():
+        async with HumePipeline(FakeClient(socket), [], depth=depth, reset_stream=reset_stream,
+                                on_result=lambda result, seq: applied.append(result['payload']),
+                                log=lambda message: None) as pipeline:
+            for payload in payloads:
+                pipeline.dispatch(payload)
+                await asyncio.sleep(0)
+            while pipeline.in_flight:
+                await asyncio.sleep(0.01)
+            pipeline.dispatch(b'last') # Would raise a stored request error
+            while pipeline.in_flight:
+                await asyncio.sleep(0.01)
+            return pipeline
+
+    return asyncio.run(run()), applied
+
+
+def test_rejected_payload_is_retried_after_reset():
+    socket = FakeSocket(reject={b'a': 1})
+    pipeline, applied = run_pipeline(socket, [b'a'])
+    assert applied == [b'a', b'last']
+    assert socket.resets == 1
+    assert pipeline.rejected == 0
+
+
+def test_payload_rejected_twice_is_skipped_and_socket_kept():
+    socket = FakeSocket(reject={b'a': 2})
+    pipeline, applied = run_pipeline(socket, [b'a'])
+    assert applied == [b'last']
+    assert pipeline.rejected == 1
+
+
+def test_response_older_than_applied_one_is_dropped():
+    socket = FakeSocket(delays={b'a': 0.05})
+    pipeline, applied = run_pipeline(socket, [b'a', b'b'], depth=2)
+    assert applied == [b'b', b'last']
+    assert pipeline.dropped_stale == 1
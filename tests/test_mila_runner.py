@@ -0,0 +1,25 @@
+import asyncio
+
+import numpy as np
+
+from mila import MilaRunner
+from mila_config import MilaConfig
+from scorers import hume_emotion_names, synthetic_prosody_result
+
+
+def test_apply_hume_result_is_quiet_with_tracing_off(capsys):
+    config = MilaConfig(backend='headless', trace_level='off', emotion_min_dwell=0.0)
+    runner = MilaRunner(config)
+    names = hume_emotion_names(config.hume_indices)
+
+    async def apply_windows():
+        for strong in ('Anger', 'Sadness'):
+            scores = np.full(len(names), 0.01)
+            scores[names.index(strong)] = 0.6
+            runner.apply_hume_result(synthetic_prosody_result(names, scores), 0.0)
+        scores[names.index('Anger')] = 0.6 # Two emotions: blinking
+        runner.apply_hume_result(synthetic_prosody_result(names, scores), 0.0)
+
+    asyncio.run(apply_windows())
+    assert runner.led_controller.is_blinking
+    assert capsys.readouterr().out == ""
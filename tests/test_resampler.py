@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from resampler import PolyphaseResampler
+
+
+@pytest.mark.parametrize('input_rate, output_rate', [(44100, 16000), (48000, 16000), (16000, 44100)])
+def test_streamed_blocks_match_one_shot(input_rate, output_rate):
+    signal = np.random.default_rng(1).uniform(-1.0, 1.0, input_rate // 2).astype(np.float32)
+    one_shot = PolyphaseResampler(input_rate, output_rate).process(signal)
+
+    resampler = PolyphaseResampler(input_rate, output_rate)
+    block_sizes = [1, 7, 512, 1024, 333] * 100
+    blocks, start = [], 0
+    for size in block_sizes:
+        blocks.append(resampler.process(signal[start:start + size]))
+        start += size
+        if start >= len(signal):
+            break
+    streamed = np.concatenate(blocks)
+
+    assert len(one_shot) == -(-len(signal) * output_rate // input_rate)
+    np.testing.assert_allclose(streamed, one_shot, atol=1e-5)
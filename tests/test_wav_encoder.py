@@ -0,0 +1,37 @@
+import base64
+import io
+
+import numpy as np
+import soundfile as sf
+
+from ring_buffer import AudioRingBuffer
+from wav_encoder import WindowedWavEncoder
+
+
+def test_windowed_encoder_decodes_to_the_source_window():
+    samplerate = 16000
+    encoder = WindowedWavEncoder(samplerate, step_samples=301, steps_per_window=3)
+    assert encoder.step_samples == 300
+    # Not a multiple of the step, so steps straddle the wrap point as the buffer fills
+    ring_buffer = AudioRingBuffer(encoder.window_samples + encoder.step_samples + 100)
+    source = np.random.default_rng(0).uniform(-1.0, 1.0, 20 * encoder.step_samples).astype(np.float32)
+
+    windows = 0
+    last_step = None
+    for start in range(0, len(source), 257): # Blocks unaligned with the steps, as from the callback
+        ring_buffer.write(source[start:start + 257])
+        end_step = encoder.latest_step(ring_buffer)
+        if end_step is None or end_step == last_step:
+            continue
+        last_step = end_step
+
+        wav = base64.b64decode(encoder.encode(ring_buffer))
+        decoded, decoded_rate = sf.read(io.BytesIO(wav), dtype='int16')
+        end = end_step * encoder.step_samples
+        expected = (source[end - encoder.window_samples:end] * 32767.0).astype(np.int16)
+        assert decoded_rate == samplerate
+        np.testing.assert_array_equal(decoded, expected)
+        windows += 1
+
+    assert ring_buffer.total_written > 2 * ring_buffer.capacity
+    assert windows == 20 - encoder.steps_per_window + 1
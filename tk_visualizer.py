@@ -0,0 +1,194 @@
+import multiprocessing
+import queue
+import threading
+import tkinter as tk
+
+
+class EmotionBar:
+    """Canvas items and display state of one emotion bar."""
+
+    def __init__(self, rect_id, text_id, name, y0, y1):
+        self.rect_id = rect_id
+        self.text_id = text_id
+        self.name = name
+        self.y0 = y0
+        self.y1 = y1
+        self.score = None
+        self.color = None
+        self.width = 0.0          # Width currently drawn
+        self.target_width = 0.0   # Width for the latest score
+
+
+class VisualizerWindow:
+    """The virtual LED window: LED circle, emotion label and emotion bars.
+
+    Must be created and used only from the thread that runs its Tk event loop.
+    Bars are created once and then updated in place; with `bar_smoothing` > 0 their
+    widths glide towards the latest scores (that fraction of the remaining distance
+    per frame) instead of snapping once per analysis.
+    """
+
+    def __init__(self, root, title="Emotion Visualizer", bar_smoothing=0.25):
+        self.root = root
+        self.root.title(title)
+        self.bar_smoothing = bar_smoothing
+
+        # Main LED canvas
+        self.led_canvas_height = 200
+        self.led_canvas = tk.Canvas(self.root, width=200, height=self.led_canvas_height)
+        self.led_canvas.pack()
+        self.virtual_led = self.led_canvas.create_oval(50, 50, 150, 150, fill="#000000")
+        self.emotion_label = tk.Label(self.root, text="Initializing...", font=("Helvetica", 14))
+        self.emotion_label.pack(pady=5)
+
+        # Emotion bars canvas
+        self.bars_canvas_height = 330 # Increased height for better padding
+        self.bars_canvas_width = 350
+        self.bars_canvas = tk.Canvas(self.root, width=self.bars_canvas_width, height=self.bars_canvas_height, bg="lightgray")
+        self.bars_canvas.pack(pady=10)
+        self.emotion_bars = [] # EmotionBar per displayed emotion, in display order
+
+        # Bar layout
+        self.bar_x0 = 20
+        self.bar_max_width = self.bars_canvas_width - 40
+        self.bar_height = 20
+        self.bar_spacing_y = 55  # Increased vertical spacing
+        self.bar_start_y = 20
+        self.bar_text_y_offset = 8 # Increased gap between bar and text
+
+        # Adjusted window geometry
+        new_total_height = self.led_canvas_height + self.bars_canvas_height + self.emotion_label.winfo_reqheight() + 40 # Added padding
+        self.root.geometry(f"{self.bars_canvas_width}x{new_total_height}")
+
+    def set_led(self, fill, label_text):
+        self.led_canvas.itemconfig(self.virtual_led, fill=fill)
+        self.emotion_label.config(text=label_text)
+
+    def _create_emotion_bars(self, names):
+        for bar in self.emotion_bars:
+            self.bars_canvas.delete(bar.rect_id)
+            self.bars_canvas.delete(bar.text_id)
+        self.emotion_bars = []
+
+        for i, name in enumerate(names):
+            y0 = self.bar_start_y + i * self.bar_spacing_y
+            y1 = y0 + self.bar_height
+            rect_id = self.bars_canvas.create_rectangle(self.bar_x0, y0, self.bar_x0, y1, fill="#808080", outline="black")
+            # Place text below the bar with increased offset
+            text_id = self.bars_canvas.create_text(self.bar_x0, y1 + self.bar_text_y_offset, anchor=tk.NW, text=name, font=("Helvetica", 10))
+            self.emotion_bars.append(EmotionBar(rect_id, text_id, name, y0, y1))
+
+    def update_emotion_bars(self, emotion_data):
+        """Set new scores. Only bars whose score or color changed touch the canvas."""
+        if [name for name, _, _ in emotion_data] != [bar.name for bar in self.emotion_bars]:
+            self._create_emotion_bars([name for name, _, _ in emotion_data]) # Emotion set changed
+
+        for bar, (name, score, bar_color_hex) in zip(self.emotion_bars, emotion_data):
+            if bar_color_hex != bar.color:
+                self.bars_canvas.itemconfig(bar.rect_id, fill=bar_color_hex)
+                bar.color = bar_color_hex
+            if score != bar.score:
+                self.bars_canvas.itemconfig(bar.text_id, text=f"{name}: {score:.3f}")
+                bar.score = score
+                bar.target_width = score * self.bar_max_width
+                if self.bar_smoothing <= 0:
+                    self._set_bar_width(bar, bar.target_width)
+
+    def animate_emotion_bars(self):
+        """Move each bar's width one frame closer to its target. Called once per frame."""
+        if self.bar_smoothing <= 0:
+            return
+        for bar in self.emotion_bars:
+            remaining = bar.target_width - bar.width
+            if remaining == 0:
+                continue
+            if abs(remaining) < 0.5: # Close enough to snap without a visible jump
+                self._set_bar_width(bar, bar.target_width)
+            else:
+                self._set_bar_width(bar, bar.width + remaining * self.bar_smoothing)
+
+    def _set_bar_width(self, bar, width):
+        bar.width = width
+        self.bars_canvas.coords(bar.rect_id, self.bar_x0, bar.y0, self.bar_x0 + width, bar.y1)
+
+
+def run_visualizer(inbox, title, frame_rate, bar_smoothing=0.25):
+    """Render loop for the visualizer thread/process: applies the latest state from `inbox`
+    on a Tk `after` timer, so the asyncio loop never touches Tk."""
+    root = tk.Tk()
+    window = VisualizerWindow(root, title, bar_smoothing=bar_smoothing)
+    frame_ms = max(1, int(1000 / frame_rate))
+
+    def poll():
+        led_state = None
+        bars_state = None
+        while True: # Drain everything queued since the last frame, keeping only the newest state
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'led':
+                led_state = message[1:]
+            elif message[0] == 'bars':
+                bars_state = message[1]
+            elif message[0] == 'close':
+                root.destroy()
+                return
+        if led_state is not None:
+            window.set_led(*led_state)
+        if bars_state is not None:
+            window.update_emotion_bars(bars_state)
+        window.animate_emotion_bars()
+        root.after(frame_ms, poll)
+
+    root.after(frame_ms, poll)
+    root.mainloop()
+
+
+def start_render_worker(target, args, use_process=False):
+    """Start `target(inbox, *args)` in a daemon thread, or a spawned process if `use_process`.
+    Returns the inbox queue to post messages to and the thread/process."""
+    if use_process:
+        context = multiprocessing.get_context('spawn')
+        inbox = context.Queue()
+        worker = context.Process(target=target, args=(inbox,) + tuple(args), daemon=True)
+    else:
+        inbox = queue.SimpleQueue()
+        worker = threading.Thread(target=target, args=(inbox,) + tuple(args), daemon=True)
+    worker.start()
+    return inbox, worker
+
+
+class RenderWorkerClient:
+    """Producer side of a render worker started with `start_render_worker`: posts messages
+    to its inbox while the worker is alive."""
+
+    def __init__(self, target, args, use_process=False):
+        self._inbox, self._worker = start_render_worker(target, args, use_process)
+
+    def _post(self, message):
+        if self._worker.is_alive(): # Nothing is draining the queue once the window is closed
+            self._inbox.put(message)
+
+    def close(self):
+        self._post(('close',))
+
+
+class TkVisualizer(RenderWorkerClient):
+    """Runs the virtual LED window in its own thread (or process) with a native Tk loop.
+
+    The producer side (`set_led`, `set_emotion_bars`) only puts small tuples on a queue
+    whose `put` never blocks, so a slow redraw cannot stall the event loop that also runs
+    the Hume websocket. Use `use_process=True` where Tk must own a main thread (macOS) or
+    to keep rendering off the interpreter running the audio pipeline entirely.
+    """
+
+    def __init__(self, title="Emotion Visualizer", frame_rate=30, use_process=False, bar_smoothing=0.25):
+        super().__init__(run_visualizer, (title, frame_rate, bar_smoothing), use_process)
+
+    def set_led(self, fill, label_text):
+        self._post(('led', fill, label_text))
+
+    def set_emotion_bars(self, emotion_data):
+        """`emotion_data` is a sequence of (name, score, hex color) tuples."""
+        self._post(('bars', tuple(emotion_data)))
@@ -0,0 +1,249 @@
+import contextlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACE_LEVELS = ('off', 'info', 'spans')
+
+# Upper bounds (s) of the Prometheus histogram buckets for span durations
+SPAN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record_span(self.name, self.start, time.monotonic())
+
+
+class SpanStats:
+    """Count, total and histogram of one span's durations, for the metrics endpoint."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.bucket_counts = [0] * len(SPAN_BUCKETS)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        for index, bound in enumerate(SPAN_BUCKETS):
+            if duration <= bound:
+                self.bucket_counts[index] += 1
+
+
+class Tracer:
+    """Per-cycle log messages and stage spans, recorded into a ring buffer on the hot path and
+    written out by a background thread.
+
+    Recording an event only stores a tuple and bumps a counter; formatting, console output,
+    the JSON lines file (`path`) and the Prometheus-style `/metrics` endpoint (`metrics_port`)
+    are all handled by the flush thread every `flush_interval` seconds. If the loop records
+    more than `capacity` events between flushes the oldest are lost and counted in `dropped`.
+
+    `level` is 'info' (log messages only) or 'spans' (messages and span timings). Use
+    `create_tracer`, which returns a `NullTracer` when tracing is off.
+    """
+
+    enabled = True
+
+    def __init__(self, level='info', capacity=4096, path=None, metrics_port=None, console=True, flush_interval=0.5):
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"Unknown trace level '{level}'. Choose from: {', '.join(TRACE_LEVELS)}")
+        self.level = level
+        self.spans_enabled = level == 'spans'
+        self.capacity = capacity
+        self.console = console
+        self.flush_interval = flush_interval
+
+        self._events = [None] * capacity
+        self.total_recorded = 0 # Published last, like AudioRingBuffer.total_written
+        self._flushed = 0
+        self.dropped = 0
+        self.cycle = 0
+        self._cycle_start = time.monotonic()
+
+        self._file = open(path, 'a') if path else None
+        self._stats_lock = threading.Lock()
+        self.span_stats = {}
+
+        self._server = None
+        if metrics_port is not None:
+            self._server = ThreadingHTTPServer(('', metrics_port), _metrics_handler(self))
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        self._stop = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+
+    # --- Hot path: called from the event loop ---
+
+    def begin_cycle(self):
+        """Start a new analysis cycle; later events are tagged with its number and log
+        messages are timestamped relative to its start. Returns the start time."""
+        self.cycle += 1
+        self._cycle_start = time.monotonic()
+        return self._cycle_start
+
+    def log(self, message, reference_time=None):
+        """Queue a console/file message, timestamped relative to `reference_time` (default:
+        the start of the current cycle)."""
+        start = self._cycle_start if reference_time is None else reference_time
+        self._record(('log', self.cycle, start, time.monotonic(), message))
+
+    def span(self, name):
+        """Context manager timing a stage of the current cycle."""
+        if not self.spans_enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record_span(self, name, start, end, cycle=None):
+        """Record a span measured elsewhere (e.g. a request completed in a callback)."""
+        if self.spans_enabled:
+            self._record(('span', self.cycle if cycle is None else cycle, start, end, name))
+
+    def _record(self, event):
+        self._events[self.total_recorded % self.capacity] = event
+        self.total_recorded += 1
+
+    # --- Flush thread ---
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def _take_events(self):
+        end = self.total_recorded
+        start = max(self._flushed, end - self.capacity)
+        events = [self._events[index % self.capacity] for index in range(start, end)]
+        # Slots the loop overwrote while we were copying may be torn; discard them
+        oldest_intact = self.total_recorded - self.capacity
+        if oldest_intact > start:
+            events = events[oldest_intact - start:]
+            start = oldest_intact
+        self.dropped += start - self._flushed
+        self._flushed = end
+        return events
+
+    def flush(self):
+        events = self._take_events()
+        if not events:
+            return
+        lines = []
+        for kind, cycle, start, end, text in events:
+            if kind == 'log':
+                if self.console:
+                    print(f"[{end - start:.3f}s] {text}")
+                if self._file is not None:
+                    lines.append(json.dumps({'type': 'log', 'cycle': cycle, 'time': end, 'elapsed': end - start, 'message': text}))
+            else:
+                with self._stats_lock:
+                    stats = self.span_stats.get(text)
+                    if stats is None:
+                        stats = self.span_stats[text] = SpanStats()
+                    stats.add(end - start)
+                if self._file is not None:
+                    lines.append(json.dumps({'type': 'span', 'cycle': cycle, 'span': text, 'start': start, 'duration': end - start}))
+        if self._file is not None and lines:
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+
+    def metrics_text(self):
+        """Span histograms and tracer counters in the Prometheus text exposition format."""
+        lines = [
+            '# HELP mila_span_duration_seconds Duration of pipeline stages.',
+            '# TYPE mila_span_duration_seconds histogram',
+        ]
+        with self._stats_lock:
+            for name, stats in sorted(self.span_stats.items()):
+                for bound, count in zip(SPAN_BUCKETS, stats.bucket_counts):
+                    lines.append(f'mila_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'mila_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {stats.count}')
+                lines.append(f'mila_span_duration_seconds_sum{{span="{name}"}} {stats.total}')
+                lines.append(f'mila_span_duration_seconds_count{{span="{name}"}} {stats.count}')
+        lines += [
+            '# TYPE mila_cycles_total counter',
+            f'mila_cycles_total {self.cycle}',
+            '# TYPE mila_trace_events_dropped_total counter',
+            f'mila_trace_events_dropped_total {self.dropped}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        self._stop.set()
+        self._flush_thread.join()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NullTracer:
+    """Tracer used when tracing is off: every call is a no-op."""
+
+    enabled = False
+    spans_enabled = False
+    cycle = 0
+
+    def begin_cycle(self):
+        return time.monotonic()
+
+    def log(self, message, reference_time=None):
+        pass
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def record_span(self, name, start, end, cycle=None):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _metrics_handler(tracer):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = tracer.metrics_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Scrapes would otherwise print to the console every few seconds
+
+    return MetricsHandler
+
+
+def create_tracer(config):
+    """Tracer for a MilaConfig's trace_* settings."""
+    if config.trace_level == 'off' and not config.trace_path and config.metrics_port is None:
+        return NullTracer()
+    level = config.trace_level
+    if level == 'off' or ((config.trace_path or config.metrics_port is not None) and level == 'info'):
+        level = 'spans' # Exporting implies recording spans
+    return Tracer(level, path=config.trace_path, metrics_port=config.metrics_port,
+                  console=config.trace_level != 'off')
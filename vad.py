@@ -0,0 +1,77 @@
+import numpy as np
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+WEBRTC_SAMPLERATES = (8000, 16000, 32000, 48000)
+
+
+class VoiceActivityGate:
+    """Decides whether a block of audio is worth sending to Hume.
+
+    The default detector splits the block into short frames and counts a frame as voiced
+    when its energy is above a threshold and its zero-crossing rate is low enough to rule
+    out hiss and fan noise. With `use_webrtcvad=True` the frames are classified by the
+    optional `webrtcvad` package instead (needs 8/16/32/48 kHz audio).
+
+    The gate has hysteresis (a louder `enter_db` to open than `exit_db` to stay open) and
+    a hangover: after the last voiced block it stays open for `hangover_blocks` more
+    blocks, e.g. so a sliding window that still contains speech keeps being analysed.
+    """
+
+    def __init__(self, samplerate, enter_db=-45.0, exit_db=-50.0, max_zcr=0.35,
+                 min_voiced_fraction=0.1, hangover_blocks=2, frame_duration=0.03,
+                 use_webrtcvad=False, webrtcvad_mode=2):
+        self.samplerate = int(samplerate)
+        self.enter_db = enter_db
+        self.exit_db = exit_db
+        self.max_zcr = max_zcr                          # Zero crossings per sample
+        self.min_voiced_fraction = min_voiced_fraction
+        self.hangover_blocks = hangover_blocks
+        self.frame_samples = int(self.samplerate * frame_duration)
+
+        self._webrtc = None
+        if use_webrtcvad:
+            if webrtcvad is None:
+                raise ImportError("use_webrtcvad=True requires the webrtcvad package (pip install webrtcvad)")
+            if self.samplerate not in WEBRTC_SAMPLERATES:
+                raise ValueError(f"webrtcvad needs one of {WEBRTC_SAMPLERATES} Hz, got {self.samplerate} Hz")
+            self._webrtc = webrtcvad.Vad(webrtcvad_mode)
+
+        self.is_active = False
+        self._blocks_since_voice = None  # None until the first voiced block
+
+    def _frames(self, samples):
+        num_frames = len(samples) // self.frame_samples
+        return np.asarray(samples[:num_frames * self.frame_samples], dtype=np.float32).reshape(num_frames, self.frame_samples)
+
+    def voiced_fraction(self, samples):
+        """Fraction of frames in `samples` (floats in -1..1) classified as voiced."""
+        frames = self._frames(samples)
+        if len(frames) == 0:
+            return 0.0
+
+        if self._webrtc is not None:
+            pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype('<i2')
+            voiced = sum(self._webrtc.is_speech(frame.tobytes(), self.samplerate) for frame in pcm)
+            return voiced / len(frames)
+
+        threshold_db = self.exit_db if self.is_active else self.enter_db
+        threshold_power = 10.0 ** (threshold_db / 10.0)
+        power = np.einsum('ij,ij->i', frames, frames) / self.frame_samples # Mean square per frame
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_samples
+        voiced = (power > threshold_power) & (zcr < self.max_zcr)
+        return np.count_nonzero(voiced) / len(frames)
+
+    def process(self, samples):
+        """Feed the newest block of audio. Returns True if the gate is open."""
+        if self.voiced_fraction(samples) >= self.min_voiced_fraction:
+            self._blocks_since_voice = 0
+        elif self._blocks_since_voice is not None:
+            self._blocks_since_voice += 1
+
+        self.is_active = self._blocks_since_voice is not None and self._blocks_since_voice <= self.hangover_blocks
+        return self.is_active
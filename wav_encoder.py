@@ -0,0 +1,146 @@
+import base64
+import struct
+
+import numpy as np
+
+WAV_HEADER_SIZE = 44
+# Header padded with a 2-byte JUNK chunk to 54 bytes, a multiple of 3, so its base64
+# form ends on a group boundary and encoded PCM segments can be appended to it
+ALIGNED_WAV_HEADER_SIZE = 54
+
+
+def write_wav_header(buffer, num_samples, samplerate, channels=1, offset=0, pad_to_base64_boundary=False):
+    """Write a 16-bit PCM RIFF/WAVE header for `num_samples` frames into `buffer` at `offset`."""
+    block_align = channels * 2
+    data_size = num_samples * block_align
+    junk_size = 2 if pad_to_base64_boundary else None
+    header_size = ALIGNED_WAV_HEADER_SIZE if pad_to_base64_boundary else WAV_HEADER_SIZE
+    struct.pack_into(
+        '<4sI4s4sIHHIIHH', buffer, offset,
+        b'RIFF', header_size - 8 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, samplerate, samplerate * block_align, block_align, 16
+    )
+    offset += 36
+    if junk_size is not None:
+        struct.pack_into('<4sI', buffer, offset, b'JUNK', junk_size)
+        offset += 8 + junk_size
+    struct.pack_into('<4sI', buffer, offset, b'data', data_size)
+
+
+def float_to_pcm16(samples, out, scratch):
+    """Convert float samples in -1..1 to int16 in `out`, using `scratch` (float32) for scaling."""
+    np.multiply(samples, 32767.0, out=scratch)
+    np.clip(scratch, -32768.0, 32767.0, out=scratch)
+    out[:] = scratch # Cast to int16 directly into the destination
+
+
+class WavEncoder:
+    """Encodes float audio windows as base64 WAV without touching the filesystem.
+
+    The header and int16 PCM are written into a bytearray that is reused between calls,
+    so a steady-state cycle does no file I/O and only allocates the base64 output.
+    Set `dump_path` to also write each chunk to disk for debugging.
+    """
+
+    def __init__(self, samplerate, channels=1, dump_path=None):
+        self.samplerate = int(samplerate)
+        self.channels = channels
+        self.dump_path = dump_path
+        self._buffer = bytearray()
+        self._scratch = np.empty(0, dtype=np.float32) # Float staging area for scaling/clipping
+        self._num_samples = -1
+
+    def _prepare(self, num_samples):
+        if num_samples == self._num_samples:
+            return
+        self._buffer = bytearray(WAV_HEADER_SIZE + num_samples * self.channels * 2)
+        self._scratch = np.empty(num_samples * self.channels, dtype=np.float32)
+        write_wav_header(self._buffer, num_samples, self.samplerate, self.channels)
+        self._num_samples = num_samples
+
+    def to_wav_bytes(self, samples):
+        """Return a memoryview of the WAV file for `samples` (floats in -1..1, or int16).
+
+        The view points into the reusable buffer and is overwritten by the next call.
+        """
+        samples = np.asarray(samples)
+        num_samples = len(samples)
+        self._prepare(num_samples)
+
+        pcm = np.frombuffer(self._buffer, dtype='<i2', offset=WAV_HEADER_SIZE)
+        if samples.dtype == np.int16:
+            pcm[:] = samples.reshape(-1)
+        else:
+            float_to_pcm16(samples.reshape(-1), pcm, self._scratch)
+        return memoryview(self._buffer)
+
+    def encode(self, samples):
+        """Return the base64-encoded WAV for `samples`, ready for `socket.send_bytes`."""
+        wav_bytes = self.to_wav_bytes(samples)
+        if self.dump_path:
+            with open(self.dump_path, 'wb') as dump_file:
+                dump_file.write(wav_bytes)
+        return base64.b64encode(wav_bytes)
+
+
+class WindowedWavEncoder:
+    """Base64 WAV encoder for a sliding window that only encodes each step once.
+
+    The window is split into `steps_per_window` segments on a fixed grid of absolute
+    sample positions in an `AudioRingBuffer`. Each segment's base64 text is cached, so
+    a cycle encodes only the newest step and joins the cached segments behind a
+    precomputed header. Base64 only concatenates cleanly on 3-byte boundaries, so the
+    header is padded to 54 bytes and `step_samples` is rounded down to a multiple of 3
+    (6 bytes of mono int16). The window ends on the last complete step, so callers
+    should run cycles right after a step boundary. Mono only.
+    """
+
+    def __init__(self, samplerate, step_samples, steps_per_window, dump_path=None):
+        self.samplerate = int(samplerate)
+        self.step_samples = int(step_samples) - int(step_samples) % 3
+        self.steps_per_window = int(steps_per_window)
+        self.window_samples = self.step_samples * self.steps_per_window
+        self.dump_path = dump_path
+
+        header = bytearray(ALIGNED_WAV_HEADER_SIZE)
+        write_wav_header(header, self.window_samples, self.samplerate, pad_to_base64_boundary=True)
+        self._header_b64 = base64.b64encode(header)
+
+        self._segments = {} # Step index on the absolute sample grid -> base64 PCM
+        self._float_step = np.empty(self.step_samples, dtype=np.float32)
+        self._pcm_step = np.empty(self.step_samples, dtype='<i2')
+
+    def latest_step(self, ring_buffer):
+        """Index of the last complete step in `ring_buffer`, or None if the window is not yet full."""
+        end_step = ring_buffer.total_written // self.step_samples
+        first_sample = (end_step - self.steps_per_window) * self.step_samples
+        if first_sample < ring_buffer.total_written - len(ring_buffer):
+            return None
+        return end_step
+
+    def encode(self, ring_buffer):
+        """Return the base64 WAV of the latest complete window in `ring_buffer`."""
+        end_step = self.latest_step(ring_buffer)
+        if end_step is None:
+            raise ValueError("Not enough audio buffered for a full window")
+        first_step = end_step - self.steps_per_window
+
+        for step in [s for s in self._segments if s < first_step]:
+            del self._segments[step]
+
+        parts = [self._header_b64]
+        for step in range(first_step, end_step):
+            segment = self._segments.get(step)
+            if segment is None:
+                start = step * self.step_samples
+                ring_buffer.read(start, start + self.step_samples, out=self._float_step)
+                float_to_pcm16(self._float_step, self._pcm_step, self._float_step)
+                segment = base64.b64encode(self._pcm_step)
+                self._segments[step] = segment
+            parts.append(segment)
+        encoded = b''.join(parts)
+
+        if self.dump_path:
+            with open(self.dump_path, 'wb') as dump_file:
+                dump_file.write(base64.b64decode(encoded))
+        return encoded